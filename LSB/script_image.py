@@ -1,51 +1,34 @@
 from PIL import Image
 import numpy as np
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Utility'))
+from embedders import get_embedder
+from image_writers import save_stego_image, load_stego_image
 
 input_image_path="Sample1.jpeg"
 output_image_path="image_output1.png"
 
 
-def text_to_bits(text):
-    return ''.join(format(ord(c), '08b') for c in text)
-
-def encode_lsb(input_image_path, message, output_image_path):
+def encode_lsb(input_image_path, message, output_image_path, writer=None, **writer_options):
     img = Image.open(input_image_path).convert('RGB')
     data = np.array(img)
 
-    # bits + end marker
-    message += "#####END#####"
-    bits = ''.join([format(ord(c), '08b') for c in message])
-
-    flat_data = data.flatten()
-
-    if len(bits) > len(flat_data):
-        raise ValueError("Message too large to hide in this image!")
+    # header (magic, length, CRC32) + message bits in the LSBs
+    encoded_data = get_embedder('image_lsb').embed(data, message.encode('utf-8'))
 
-    # Embed bits into LSB
-    for i in range(len(bits)):
-        flat_data[i] = (flat_data[i] & 254) | int(bits[i])
-
-    encoded_data = flat_data.reshape(data.shape)
-    encoded_img = Image.fromarray(encoded_data.astype('uint8'), 'RGB')
-    encoded_img.save(output_image_path)
+    # lossless writer from the output extension, e.g. compress_level=1 for fast PNG
+    save_stego_image(encoded_data, output_image_path, writer, **writer_options)
     print("Message encoded and saved to", output_image_path)
 
 def decode_lsb(encoded_image_path):
-    img = Image.open(encoded_image_path).convert('RGB')
-    data = np.array(img)
-    flat_data = data.flatten()
-
-    # Extract LSB
-    bits = [str(flat_data[i] & 1) for i in range(len(flat_data))]
-    chars = [chr(int(''.join(bits[i:i+8]), 2)) for i in range(0, len(bits), 8)]
-    message = ''.join(chars)
-
-    # Stop at end marker
-    end_marker = "#####END#####"
-    if end_marker in message:
-        message = message[:message.index(end_marker)]
-    else:
-        message = "End marker not found or message corrupted."
+    data = load_stego_image(encoded_image_path)
+
+    try:
+        message = get_embedder('image_lsb').extract(data).decode('utf-8')
+    except ValueError:
+        message = "Stego header not found or message corrupted."
 
     return message
 
@@ -1,14 +1,16 @@
-import numpy as np
 from scipy.io.wavfile import read, write
 import os
+import sys
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Utility'))
+from embedders import get_embedder
 
-def file_to_bits(filepath):
-    """Reads any file and returns its content as a bit string."""
+
+def read_payload(filepath):
+    """Reads any file and returns its content as bytes."""
     try:
         with open(filepath, 'rb') as f:
-            file_data = f.read()
-        return ''.join(format(byte, '08b') for byte in file_data)
+            return f.read()
     except FileNotFoundError:
         print(f"Error: Payload file not found at {filepath}")
         return None
@@ -23,44 +25,17 @@ def encode_audio_2bit_lsb(carrier_path, payload_path, output_path):
         print(f"Error: Carrier file not found at {carrier_path}")
         return
 
-    flat_carrier = carrier_data.flatten()
-    
     print(f"Reading payload file: {payload_path}")
-    payload_bits = file_to_bits(payload_path)
-    if payload_bits is None: return
-    
-    payload_size = len(payload_bits)
-    size_bits = format(payload_size, '032b') # 32-bit size header
-    bits_to_hide = size_bits + payload_bits
-    
-
-    carrier_capacity = len(flat_carrier) * 2
+    payload = read_payload(payload_path)
+    if payload is None: return
     
-    if len(bits_to_hide) > carrier_capacity:
-        raise ValueError(f"Payload is too large for this carrier! \n"
-                         f"Needed: {len(bits_to_hide)} bits \n"
-                         f"Have:   {carrier_capacity} bits")
+    embedder = get_embedder('audio_lsb_2bit')
+    print(f"Hiding {len(payload)} bytes in {embedder.capacity(carrier_data)} available bytes.")
 
-    print(f"Hiding {len(bits_to_hide)} bits in {carrier_capacity} available bits.")
-
-
-    num_samples_needed = (len(bits_to_hide) + 1) // 2
-    
-    for i in range(num_samples_needed):
-        bit_chunk_start = i * 2
-        bit_chunk = bits_to_hide[bit_chunk_start : bit_chunk_start + 2]
-        
-        if len(bit_chunk) == 1:
-            bit_chunk += '0'
-            
-        bits_as_int = int(bit_chunk, 2)
-        
-        flat_carrier[i] = (flat_carrier[i] & ~3) | bits_as_int
-
-    stego_data = flat_carrier.reshape(carrier_data.shape)
+    stego_data = embedder.embed(carrier_data, payload)
     
     print(f"Saving stego audio to {output_path}...")
-    write(output_path, sample_rate, stego_data.astype(carrier_data.dtype))
+    write(output_path, sample_rate, stego_data)
     print("Encoding complete.")
 
 def decode_audio_2bit_lsb(stego_path, output_payload_path):
@@ -73,33 +48,9 @@ def decode_audio_2bit_lsb(stego_path, output_payload_path):
         print(f"Error: Stego file not found at {stego_path}")
         return
         
-    flat_stego = stego_data.flatten()
-    
     print("Extracting LSBs...")
-    extracted_bits = []
-    for sample in flat_stego:s
-        extracted_int = sample & 3
-        extracted_bits.append(format(extracted_int, '02b'))
-
-    bits_str = "".join(extracted_bits)
-
-    if len(bits_str) < 32:
-        raise ValueError("File is too small to contain a size header.")
-        
-    size_bits_str = bits_str[:32]
-    payload_size = int(size_bits_str, 2)
-    print(f"Header found. Expecting payload of {payload_size} bits.")
-
-    total_bits_expected = 32 + payload_size
-    if len(bits_str) < total_bits_expected:
-        raise ValueError(f"File is corrupted. Expected {total_bits_expected} bits, found {len(bits_str)}.")
-    
-    payload_bits_str = bits_str[32 : total_bits_expected]
-
-    print("Reconstructing payload file...")
-    byte_strings = [payload_bits_str[i:i+8] for i in range(0, len(payload_bits_str), 8)]
-    
-    byte_data = bytes([int(b_str, 2) for b_str in byte_strings if len(b_str) == 8])
+    byte_data = get_embedder('audio_lsb_2bit').extract(stego_data)
+    print(f"Payload of {len(byte_data)} bytes passed its checksum.")
 
     with open(output_payload_path, 'wb') as f:
         f.write(byte_data)
@@ -1,53 +1,39 @@
 from PIL import Image
 import numpy as np
 import os
+import sys
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Utility'))
+from stego_header import HEADER_BITS
+from embedders import get_embedder
+from image_writers import save_stego_image, load_stego_image
 
-def file_to_bits(filepath):
-    """Reads a file and returns its content as a bit string."""
-    with open(filepath, 'rb') as f:
-
-        file_data = f.read()
-    
 
-    return ''.join(format(byte, '08b') for byte in file_data)
+def read_payload(filepath):
+    """Reads a file and returns its content as bytes."""
+    with open(filepath, 'rb') as f:
+        return f.read()
 
 
-def encode_image_lsb(carrier_image_path, payload_image_path, output_image_path):
-    """Hides a payload file inside a carrier image."""
+def encode_image_lsb(carrier_image_path, payload_image_path, output_image_path,
+                     writer=None, **writer_options):
+    """
+    Hides a payload file inside a carrier image.
+    The stego image is written with a lossless writer chosen by writer (or the
+    output extension): 'png', 'webp', 'tiff', 'bmp' or 'npy'.
+    """
     
 
     img = Image.open(carrier_image_path).convert('RGB')
     data = np.array(img)
-    flat_data = data.flatten()
-    
-    payload_bits = file_to_bits(payload_image_path)
-    payload_size = len(payload_bits)
-    
-    size_bits = format(payload_size, '032b')
+    embedder = get_embedder('image_lsb')
     
-    
-    bits_to_hide = size_bits + payload_bits
-    
-
-    total_bits_needed = len(bits_to_hide)
-    carrier_capacity = len(flat_data)
-    
-    if total_bits_needed > carrier_capacity:
-        raise ValueError(f"Payload is too large for this carrier image! \n"
-                         f"Needed: {total_bits_needed} bits \n"
-                         f"Have:   {carrier_capacity} bits")
-
-    print(f"Hiding {payload_size} bits (plus 32-bit header) in {carrier_capacity} available bits.")
-
+    payload = read_payload(payload_image_path)
+    print(f"Hiding {len(payload) * 8} bits (plus {HEADER_BITS}-bit header) in {data.size} available bits.")
 
-    for i in range(total_bits_needed):
-        flat_data[i] = (flat_data[i] & 254) | int(bits_to_hide[i])
+    encoded_data = embedder.embed(data, payload)
 
-
-    encoded_data = flat_data.reshape(data.shape)
-    encoded_img = Image.fromarray(encoded_data.astype('uint8'), 'RGB')
-    encoded_img.save(output_image_path)
+    save_stego_image(encoded_data, output_image_path, writer, **writer_options)
     print("Encoding complete. Stego image saved as", output_image_path)
 
 
@@ -55,36 +41,8 @@ def decode_image_lsb(stego_image_path, output_payload_path):
     """Extracts a hidden file from a stego image."""
     
     print(f"Decoding {stego_image_path}...")
-    img = Image.open(stego_image_path).convert('RGB')
-    data = np.array(img).flatten()
-
-    # Extract all LSBs from the image
-    lsb_bits = [str(d & 1) for d in data]
-
-
-    if len(lsb_bits) < 32:
-        raise ValueError("Image is too small to contain a 32-bit size header.")
-        
-    size_bits_str = "".join(lsb_bits[:32])
-    payload_size = int(size_bits_str, 2)
-    print(f"Header found. Expecting payload of {payload_size} bits.")
-
-
-    total_bits_expected = 32 + payload_size
-    if len(lsb_bits) < total_bits_expected:
-        raise ValueError(f"Image is corrupted or incomplete. "
-                         f"Expected {total_bits_expected} bits, found {len(lsb_bits)}.")
-    
-    
-    payload_bits_str = "".join(lsb_bits[32 : total_bits_expected])
-
-    byte_strings = [payload_bits_str[i:i+8] for i in range(0, len(payload_bits_str), 8)]
-    
-    if len(byte_strings[-1]) != 8:
-        print("Warning: Final byte is incomplete. Data might be corrupt.")
-        byte_strings = byte_strings[:-1] 
-
-    byte_data = bytes([int(b_str, 2) for b_str in byte_strings])
+    byte_data = get_embedder('image_lsb').extract(load_stego_image(stego_image_path))
+    print(f"Payload of {len(byte_data)} bytes passed its checksum.")
 
  
     with open(output_payload_path, 'wb') as f:
@@ -125,4 +83,4 @@ except FileNotFoundError:
 except ValueError as e:
     print(f"\n--- A controlled error occurred ---")
     print(e)
-    print("This often happens if the payload image is too big for the carrier.") sizes for comparison
+    print("This often happens if the payload image is too big for the carrier.")
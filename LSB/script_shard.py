@@ -0,0 +1,186 @@
+from PIL import Image
+import numpy as np
+from scipy.io.wavfile import read, write
+from concurrent.futures import ProcessPoolExecutor
+import os
+import struct
+import sys
+import zlib
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Utility'))
+from stego_header import (HEADER_SIZE, HEADER_BITS, frame_payload, parse_header, verify_payload,
+                          bits_to_bytes, embed_lsb, extract_lsb)
+from image_writers import save_stego_image, load_stego_image
+
+
+# Shard header, stored after the stego header of every carrier (big-endian):
+#   CRC32 of the whole payload (4 bytes) | whole payload length (4) | shard index (2) | shard count (2)
+SHARD_FORMAT = '>IIHH'
+SHARD_SIZE = struct.calcsize(SHARD_FORMAT)
+
+AUDIO_EXTENSIONS = ('.wav',)
+
+
+def is_audio(path):
+    return path.lower().endswith(AUDIO_EXTENSIONS)
+
+
+def carrier_capacity(carrier_path):
+    """
+    Returns how many payload bytes one shard in this carrier can hold.
+    Images use 1-bit LSB on every RGB value, audio uses 2-bit LSB on every sample.
+    Only the file header is read, not the samples.
+    """
+    if is_audio(carrier_path):
+        _, data = read(carrier_path, mmap=True)
+        capacity_bits = data.size * 2
+    else:
+        with Image.open(carrier_path) as img:
+            capacity_bits = img.size[0] * img.size[1] * 3
+    return max(0, capacity_bits // 8 - HEADER_SIZE - SHARD_SIZE)
+
+
+def split_payload(payload, capacities):
+    """Splits payload into consecutive chunks that fit the given capacities, in carrier order."""
+    chunks = []
+    offset = 0
+    for capacity in capacities:
+        if offset >= len(payload):
+            break
+        if capacity == 0:
+            continue
+        chunks.append(payload[offset:offset + capacity])
+        offset += capacity
+
+    if offset < len(payload):
+        raise ValueError(f"Payload is too large for these carriers! \n"
+                         f"Needed: {len(payload)} bytes \n"
+                         f"Have:   {sum(capacities)} bytes")
+    return chunks
+
+
+def embed_shard(job):
+    """Embeds one shard (shard header + chunk) into one carrier and writes the stego file."""
+    carrier_path, output_path, shard = job
+
+    if is_audio(carrier_path):
+        sample_rate, carrier_data = read(carrier_path)
+        flat_carrier = carrier_data.reshape(-1).copy()
+        embed_lsb(flat_carrier, frame_payload('audio_lsb_2bit_shard', shard), bits_per_sample=2)
+        write(output_path, sample_rate, flat_carrier.reshape(carrier_data.shape))
+    else:
+        with Image.open(carrier_path) as img:
+            data = np.array(img.convert('RGB'))
+        embed_lsb(data.reshape(-1), frame_payload('image_lsb_shard', shard))
+        save_stego_image(data, output_path)
+
+    return output_path
+
+
+def encode_sharded(payload_path, carrier_paths, output_dir, workers=None):
+    """
+    Hides a payload that is too large for one carrier across several carriers.
+
+    The payload is split into chunks sized to each carrier's capacity and every
+    chunk gets an index, the shard count and the CRC32 of the whole payload, so
+    the shards can be put back together in any order. Shards are embedded in
+    parallel, one carrier per process. Returns the list of stego file paths.
+    """
+    with open(payload_path, 'rb') as f:
+        payload = f.read()
+    if not payload:
+        raise ValueError(f"Payload file {payload_path} is empty; there is nothing to shard.")
+
+    capacities = [carrier_capacity(path) for path in carrier_paths]
+    chunks = split_payload(payload, capacities)
+    usable = [path for path, capacity in zip(carrier_paths, capacities) if capacity > 0]
+    payload_crc = zlib.crc32(payload)
+
+    print(f"Splitting {len(payload)} bytes into {len(chunks)} shards.")
+    os.makedirs(output_dir, exist_ok=True)
+
+    jobs = []
+    for index, (carrier_path, chunk) in enumerate(zip(usable, chunks)):
+        shard = struct.pack(SHARD_FORMAT, payload_crc, len(payload), index, len(chunks)) + chunk
+        stem = os.path.splitext(os.path.basename(carrier_path))[0]
+        extension = '.wav' if is_audio(carrier_path) else '.png'
+        output_path = os.path.join(output_dir, f"{stem}_shard{index}{extension}")
+        jobs.append((carrier_path, output_path, shard))
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        outputs = list(pool.map(embed_shard, jobs))
+
+    print(f"Encoding complete. {len(outputs)} stego files written to {output_dir}")
+    return outputs
+
+
+def extract_shard(stego_path):
+    """Returns (shard fields, chunk) from one stego file; raises ValueError if it holds no valid shard."""
+    if is_audio(stego_path):
+        _, data = read(stego_path, mmap=True)
+        flat, method, bits_per_sample = data.reshape(-1), 'audio_lsb_2bit_shard', 2
+    else:
+        flat, method, bits_per_sample = load_stego_image(stego_path).reshape(-1), 'image_lsb_shard', 1
+
+    header = parse_header(extract_lsb(flat, HEADER_BITS, bits_per_sample), method)
+    total_bits = HEADER_BITS + header['length'] * 8
+    if len(flat) * bits_per_sample < total_bits:
+        raise ValueError(f"{stego_path} is truncated.")
+
+    shard = bits_to_bytes(extract_lsb(flat, total_bits, bits_per_sample)[HEADER_BITS:])
+    verify_payload(header, shard)
+
+    payload_crc, payload_length, index, count = struct.unpack(SHARD_FORMAT, shard[:SHARD_SIZE])
+    fields = {'payload_crc': payload_crc, 'payload_length': payload_length,
+              'index': index, 'count': count}
+    return fields, shard[SHARD_SIZE:]
+
+
+def decode_sharded(stego_paths, output_payload_path, workers=None):
+    """
+    Reassembles a sharded payload from its stego files, given in any order.
+    Every shard is checked against its own CRC32, and the reassembled payload
+    against the CRC32 of the whole payload.
+    """
+    if not stego_paths:
+        raise ValueError("No stego files given to reassemble.")
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        shards = list(pool.map(extract_shard, stego_paths))
+
+    first = shards[0][0]
+    for fields, _ in shards:
+        if (fields['payload_crc'], fields['count']) != (first['payload_crc'], first['count']):
+            raise ValueError("Stego files belong to different payloads.")
+
+    by_index = {fields['index']: chunk for fields, chunk in shards}
+    missing = sorted(set(range(first['count'])) - set(by_index))
+    if missing:
+        raise ValueError(f"Missing shards: {missing} (have {len(by_index)} of {first['count']}).")
+
+    payload = b''.join(by_index[i] for i in range(first['count']))
+    if len(payload) != first['payload_length'] or zlib.crc32(payload) != first['payload_crc']:
+        raise ValueError("Reassembled payload checksum mismatch. Data is corrupted.")
+
+    with open(output_payload_path, 'wb') as f:
+        f.write(payload)
+    print(f"Decoding complete. {first['count']} shards reassembled into {output_payload_path}")
+
+
+if __name__ == "__main__":
+    carriers = ["Sample1.jpeg", "sample_audio.wav"]
+    payload_to_hide = "large_payload.bin"
+    shard_dir = "shards"
+    decoded_output = "decoded_large_payload.bin"
+
+    try:
+        stego_files = encode_sharded(payload_to_hide, carriers, shard_dir)
+        decode_sharded(list(reversed(stego_files)), decoded_output)
+
+        print("\n--- Process complete ---")
+
+    except FileNotFoundError as e:
+        print(f"Error: Could not find file. {e}")
+    except ValueError as e:
+        print("\n--- An error occurred ---")
+        print(e)
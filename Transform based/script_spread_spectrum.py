@@ -0,0 +1,98 @@
+import numpy as np
+from scipy.io.wavfile import read, write
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Utility'))
+from embedders import SpreadSpectrumEmbedder
+
+
+def read_payload(filepath):
+    """Reads any file and returns its content as bytes."""
+    try:
+        with open(filepath, 'rb') as f:
+            return f.read()
+    except FileNotFoundError:
+        print(f"Error: Payload file not found at {filepath}")
+        return None
+
+
+def encode_audio_dsss(carrier_path, payload_path, output_path, strength=0.1, chip_length=1024,
+                      fec=None, repetitions=3):
+    """
+    Hides a payload file in an audio file with direct-sequence spread spectrum.
+    strength is the level of the added noise-like signal relative to the
+    carrier (0.1 is about 20 dB below it); chip_length is the number of
+    samples per bit. The decoder must use the same settings.
+    """
+    print("--- Starting Spread Spectrum Encoding ---")
+    try:
+        sample_rate, data = read(carrier_path)
+    except FileNotFoundError:
+        print(f"Error: Carrier file not found at {carrier_path}")
+        return
+
+    print(f"Reading payload file: {payload_path}")
+    payload = read_payload(payload_path)
+    if payload is None: return
+
+    embedder = SpreadSpectrumEmbedder(sample_rate, chip_length, strength=strength,
+                                      fec=fec, repetitions=repetitions)
+    print(f"Hiding {len(payload)} bytes in {embedder.capacity(data)} available bytes.")
+    stego_data = embedder.embed(data, payload)
+
+    print(f"Saving stego audio to {output_path}...")
+    write(output_path, sample_rate, stego_data)
+    print("Encoding complete.")
+
+
+def decode_audio_dsss(stego_path, output_payload_path, chip_length=1024, fec=None, repetitions=3):
+    """
+    Extracts a hidden file from a spread spectrum stego file. The file may be
+    cropped or padded; the payload is located by correlating with the sync code.
+    """
+    print("\n--- Starting Spread Spectrum Decoding ---")
+    try:
+        sample_rate, stego_data = read(stego_path)
+    except FileNotFoundError:
+        print(f"Error: Stego file not found at {stego_path}")
+        return
+
+    print("Synchronizing and despreading...")
+    embedder = SpreadSpectrumEmbedder(sample_rate, chip_length, fec=fec, repetitions=repetitions)
+    byte_data = embedder.extract(stego_data)
+    print(f"Header found. Payload of {len(byte_data)} bytes passed its checksum.")
+
+    with open(output_payload_path, 'wb') as f:
+        f.write(byte_data)
+
+    print(f"Decoding complete. Payload saved as {output_payload_path}")
+
+
+if __name__ == "__main__":
+    payload_text_file = 'my_secret_message.txt'
+    with open(payload_text_file, 'w') as f:
+        f.write("Spread spectrum survives cropping.")
+
+    carrier_audio = "sample_audio.wav"
+    stego_output = "stego_dsss_output.wav"
+    cropped_output = "stego_dsss_cropped.wav"
+    decoded_output = "decoded_message_from_dsss.txt"
+
+    try:
+        encode_audio_dsss(carrier_audio, payload_text_file, stego_output)
+
+        # Attack: drop the first 0.2 s and add noise, then decode the result
+        sample_rate, stego_data = read(stego_output)
+        cropped = stego_data[sample_rate // 5:].astype(float)
+        cropped += np.random.default_rng(0).normal(0, 50, cropped.shape)
+        write(cropped_output, sample_rate, np.clip(cropped, -32768, 32767).astype(np.int16))
+
+        decode_audio_dsss(cropped_output, decoded_output)
+
+        print("\n--- Process complete ---")
+        print(f"'{decoded_output}' should contain your original secret message.")
+
+    except (FileNotFoundError, ValueError) as e:
+        print("\n--- An error occurred ---")
+        print(e)
@@ -0,0 +1,358 @@
+import numpy as np
+from scipy.io.wavfile import read, write
+from scipy.signal import butter, sosfiltfilt
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+import hashlib
+import json
+import os
+
+from stego_header import (TUNED_HEADER_BITS, build_tuned_header, parse_tuned_header,
+                          verify_payload, bytes_to_bits, bits_to_bytes)
+from fec import encode_fec, decode_fec, coded_length
+from embedders import DCTEmbedder, PhaseEmbedder, as_carrier, as_payload, first_channel
+
+
+# Settings that carry the tuned header itself. They are fixed (apart from the
+# DCT step, see below), so the decoder can always read the header and learn
+# the settings of the payload behind it. They lean towards robustness: the
+# header segment is short (about 4 s for DCT, 0.9 s for phase at 44.1 kHz)
+# and losing it loses the payload.
+BOOTSTRAP_PARAMS = {
+    'audio_dct': {'frame_size': 512, 'first': 128, 'second': 0, 'step': 640.0,
+                  'fec': 'hamming', 'repetitions': 1},
+    'audio_phase': {'frame_size': 2048, 'first': 40, 'second': 100, 'step': 0.0,
+                    'fec': 'hamming', 'repetitions': 3},
+}
+# The DCT header's quantization step follows the carrier level, so quiet
+# carriers do not get a loud header: the largest of these steps that is at
+# most BOOTSTRAP_STEP_RATIO times the RMS of the header segment (the smallest
+# if none is). The decoder tries them in turn.
+BOOTSTRAP_DCT_STEPS = (2560.0, 1280.0, 640.0, 320.0, 160.0, 80.0)
+BOOTSTRAP_STEP_RATIO = 0.5
+
+# Parameter grids searched by tune()
+DCT_GRID = {
+    'frame_size': (512, 1024, 2048),
+    # coefficient index as a fraction of the frame size (430 / 1024 is about 0.42)
+    'coeff_position': (0.25, 0.42, 0.6),
+    'quantization_step': (20.0, 40.0, 80.0, 160.0, 320.0, 640.0),
+}
+PHASE_GRID = {
+    'frame_size': (1024, 2048, 4096),
+    'freq_range_to_modify': ((20, 50), (40, 100), (80, 160)),
+}
+
+# Attacks applied to every trial: (attack, options) in order
+ATTACK_PROFILES = {
+    'clean': (),
+    'noise': (('noise', {'snr_db': 40.0}),),
+    'lowpass': (('lowpass', {'cutoff_hz': 8000.0}),),
+    'broadcast': (('lowpass', {'cutoff_hz': 11000.0}), ('noise', {'snr_db': 35.0}),
+                  ('requantize', {'bits': 12})),
+}
+
+
+def make_embedder(method, params):
+    """Builds the embedder for a parameter block (see stego_header.PARAMS_FORMAT)."""
+    if method == 'audio_dct':
+        return DCTEmbedder(params['frame_size'], params['first'], params['step'],
+                           params['fec'], params['repetitions'])
+    if method == 'audio_phase':
+        return PhaseEmbedder(params['frame_size'], (params['first'], params['second']),
+                             params['fec'], params['repetitions'])
+    raise ValueError(f"Method '{method}' cannot be tuned. Use audio_dct or audio_phase.")
+
+
+def candidate_params(method, fec=None, repetitions=3):
+    """All parameter blocks of the method's grid."""
+    if method == 'audio_dct':
+        return [{'frame_size': size, 'first': int(position * size), 'second': 0, 'step': step,
+                 'fec': fec, 'repetitions': repetitions}
+                for size, position, step in product(*DCT_GRID.values())]
+    if method == 'audio_phase':
+        return [{'frame_size': size, 'first': low, 'second': high, 'step': 0.0,
+                 'fec': fec, 'repetitions': repetitions}
+                for size, (low, high) in product(*PHASE_GRID.values()) if high < size // 2]
+    raise ValueError(f"Method '{method}' cannot be tuned. Use audio_dct or audio_phase.")
+
+
+def protect_bits(bits, params):
+    return bits if params['fec'] is None else encode_fec(bits, params['fec'], params['repetitions'])
+
+
+def recover_bits(soft_bits, num_bits, params):
+    if params['fec'] is not None:
+        return decode_fec(soft_bits, num_bits, params['fec'], params['repetitions'])
+    if len(soft_bits) < num_bits:
+        raise ValueError(f"Not enough bits. Expected {num_bits}, found {len(soft_bits)}.")
+    return (np.asarray(soft_bits[:num_bits]) > 0).astype(np.uint8)
+
+
+def header_segment_length(method):
+    """Number of samples at the start of the signal that hold the tuned header."""
+    params = BOOTSTRAP_PARAMS[method]
+    num_bits = TUNED_HEADER_BITS if params['fec'] is None else coded_length(
+        TUNED_HEADER_BITS, params['fec'], params['repetitions'])
+    return make_embedder(method, params).samples_needed(num_bits)
+
+
+def bootstrap_candidates(method):
+    """Parameter blocks the tuned header may have been written with, largest step first."""
+    params = BOOTSTRAP_PARAMS[method]
+    if method != 'audio_dct':
+        return [params]
+    return [dict(params, step=step) for step in BOOTSTRAP_DCT_STEPS]
+
+
+def bootstrap_params(method, segment):
+    """Bootstrap parameters for a header segment; the DCT step follows its RMS level."""
+    candidates = bootstrap_candidates(method)
+    rms = np.sqrt(np.mean(np.square(segment, dtype=float))) if len(segment) else 0.0
+    fitting = [params for params in candidates if params['step'] <= BOOTSTRAP_STEP_RATIO * rms]
+    return fitting[0] if fitting else candidates[-1]
+
+
+def read_tuned_header(data, method):
+    """
+    Reads the tuned header from the start of a 1-D signal, trying every
+    bootstrap candidate. Returns (header, params) or raises ValueError.
+    """
+    segment = data[:header_segment_length(method)]
+    error = None
+    for candidate in bootstrap_candidates(method):
+        header_soft = make_embedder(method, candidate).soft_bits(segment)
+        try:
+            return parse_tuned_header(recover_bits(header_soft, TUNED_HEADER_BITS, candidate),
+                                      method)
+        except ValueError as e:
+            error = error or e
+    raise error
+
+
+def encode_tuned(carrier, payload, method, params):
+    """
+    Embeds a payload with tuned parameters and returns the stego signal (first channel).
+
+    The signal starts with a version 2 header plus the parameter block,
+    written with the method's bootstrap settings (see bootstrap_params). The
+    payload follows in the rest of the signal, written with params. Both
+    embedders only add their (windowed) changes to the carrier, which is left
+    as it is everywhere else, so the two segments join without a seam.
+    """
+    data = first_channel(as_carrier(carrier, np.int16))
+    payload = as_payload(payload)
+    split = header_segment_length(method)
+    header_params = bootstrap_params(method, data[:split])
+    bootstrap = make_embedder(method, header_params)
+    tuned = make_embedder(method, params)
+
+    header_bits = protect_bits(bytes_to_bits(build_tuned_header(method, payload, params)),
+                               header_params)
+    payload_bits = protect_bits(bytes_to_bits(payload), params)
+    if split + tuned.samples_needed(len(payload_bits)) > len(data):
+        raise ValueError(f"Payload is too large for this carrier with these settings! \n"
+                         f"Needed: {split + tuned.samples_needed(len(payload_bits))} samples \n"
+                         f"Have:   {len(data)} samples")
+
+    stego_data = np.concatenate([bootstrap.embed_bits(data[:split], header_bits),
+                                 tuned.embed_bits(data[split:], payload_bits)])
+    return tuned.to_pcm(stego_data, data.dtype)
+
+
+def decode_tuned(stego, method):
+    """
+    Reads the tuned header with the bootstrap settings, then the payload with
+    the settings stored in it. Returns (payload, params); raises ValueError
+    if the header or the payload checksum is invalid.
+    """
+    data = first_channel(as_carrier(stego, np.int16))
+    header, params = read_tuned_header(data, method)
+
+    payload_soft = make_embedder(method, params).soft_bits(data[header_segment_length(method):])
+    payload = bits_to_bytes(recover_bits(payload_soft, header['length'] * 8, params))
+    verify_payload(header, payload)
+    return payload, params
+
+
+def apply_attacks(signal, sample_rate, profile, rng):
+    """Returns the signal after the attacks of an ATTACK_PROFILES entry, as float."""
+    attacked = np.asarray(signal, dtype=float)
+    for attack, options in ATTACK_PROFILES[profile]:
+        if attack == 'noise':
+            rms = np.sqrt(np.mean(attacked ** 2))
+            attacked = attacked + rng.normal(0, rms * 10 ** (-options['snr_db'] / 20), attacked.shape)
+        elif attack == 'lowpass':
+            # zero-phase, like the delay-compensated filters of codecs and resamplers
+            sos = butter(8, options['cutoff_hz'], fs=sample_rate, output='sos')
+            attacked = sosfiltfilt(sos, attacked)
+        elif attack == 'requantize':
+            step = 2 ** (16 - options['bits'])
+            attacked = np.round(attacked / step) * step
+    return np.clip(np.round(attacked), -32768, 32767)
+
+
+def snr_db(carrier, stego):
+    """
+    SNR of stego against carrier after the best overall gain, so outputs whose
+    peaks were turned down to avoid clipping are judged by distortion, not level.
+    """
+    carrier = np.asarray(carrier, dtype=float)
+    stego = np.asarray(stego, dtype=float)
+    gain = np.dot(stego, carrier) / max(np.dot(stego, stego), 1e-12)
+    noise = np.sum((carrier - gain * stego) ** 2)
+    return float(10 * np.log10(np.sum(carrier ** 2) / max(noise, 1e-12)))
+
+
+_trial = {}
+
+
+def _init_trial(carrier, sample_rate, method, payload, profile, rounds, seed):
+    # Runs once per worker process, so the carrier is not sent with every job
+    _trial.update(carrier=carrier, sample_rate=sample_rate, method=method, payload=payload,
+                  profile=profile, rounds=rounds, seed=seed)
+
+
+def run_trial(params):
+    """Embeds, attacks and decodes once per round with one parameter block; returns the scores."""
+    t = _trial
+    result = {'params': params, 'snr_db': None, 'ber': None, 'recovered': False}
+    try:
+        stego = encode_tuned(t['carrier'], t['payload'], t['method'], params)
+    except ValueError:
+        return result
+
+    split = header_segment_length(t['method'])
+    payload_bits = protect_bits(bytes_to_bits(t['payload']), params)
+    tuned = make_embedder(t['method'], params)
+    rng = np.random.default_rng(t['seed'])
+
+    errors = 0
+    recovered = True
+    for _ in range(t['rounds']):
+        attacked = apply_attacks(stego, t['sample_rate'], t['profile'], rng)
+        soft = tuned.soft_bits(attacked[split:])[:len(payload_bits)]
+        errors += np.count_nonzero((soft > 0) != payload_bits)
+        try:
+            recovered &= decode_tuned(attacked, t['method'])[0] == t['payload']
+        except ValueError:
+            recovered = False
+
+    result.update(snr_db=snr_db(t['carrier'], stego),
+                  ber=float(errors / (len(payload_bits) * t['rounds'])), recovered=bool(recovered))
+    return result
+
+
+def best_trial(results):
+    """
+    Highest SNR among the settings whose payload survived every round, with
+    lower raw BER breaking ties. If none survived, the lowest raw BER.
+    """
+    recovered = [r for r in results if r['recovered']]
+    if recovered:
+        return max(recovered, key=lambda r: (r['snr_db'], -r['ber']))
+    scored = [r for r in results if r['ber'] is not None]
+    if not scored:
+        raise ValueError("Payload does not fit the carrier with any tuned setting.")
+    return min(scored, key=lambda r: (r['ber'], -r['snr_db']))
+
+
+def carrier_fingerprint(carrier, sample_rate):
+    """SHA-256 of the first channel's samples and the sample rate."""
+    data = np.ascontiguousarray(first_channel(as_carrier(carrier, np.int16)))
+    digest = hashlib.sha256(str(sample_rate).encode())
+    digest.update(data.tobytes())
+    return digest.hexdigest()[:32]
+
+
+def load_cache(cache_path):
+    if cache_path and os.path.exists(cache_path):
+        with open(cache_path) as f:
+            return json.load(f)
+    return {}
+
+
+def tune(carrier, sample_rate, method, payload_length, profile='noise', fec=None, repetitions=3,
+         rounds=3, trial_seconds=None, workers=None, cache_path='autotune_cache.json', seed=0):
+    """
+    Finds the embedding parameters for one carrier and attack profile.
+
+    Every setting of the method's grid is tried in a process pool: a random
+    payload of payload_length bytes is embedded, attacked and decoded
+    `rounds` times. The result with the highest SNR whose payload survived
+    every round wins (see best_trial). Results are cached in cache_path under
+    the carrier fingerprint, so tuning the same carrier again is free.
+    Returns the winning trial: params, snr_db, ber and recovered.
+    """
+    data = first_channel(as_carrier(carrier, np.int16))
+    key = (f"{carrier_fingerprint(data, sample_rate)}:{method}:{profile}:"
+           f"{payload_length}:{fec}:{repetitions}")
+    cache = load_cache(cache_path)
+    if key in cache:
+        print(f"Using cached settings for {key.split(':')[0]}")
+        return cache[key]
+
+    if trial_seconds:
+        data = data[:int(trial_seconds * sample_rate)]
+    payload = np.random.default_rng(seed).integers(0, 256, payload_length, dtype=np.uint8).tobytes()
+    candidates = candidate_params(method, fec, repetitions)
+    print(f"Trying {len(candidates)} settings for {method} against '{profile}'...")
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_trial,
+                             initargs=(np.asarray(data), sample_rate, method, payload, profile,
+                                       rounds, seed)) as pool:
+        results = list(pool.map(run_trial, candidates))
+
+    best = best_trial(results)
+    if cache_path:
+        cache[key] = best
+        with open(cache_path, 'w') as f:
+            json.dump(cache, f, indent=2)
+    return best
+
+
+def encode_tuned_file(carrier_path, payload_path, output_path, method='audio_dct',
+                      profile='noise', fec=None, repetitions=3, **tune_options):
+    """Tunes the method for the carrier, then writes the stego file with the settings in its header."""
+    sample_rate, data = read(carrier_path)
+    with open(payload_path, 'rb') as f:
+        payload = f.read()
+
+    best = tune(data, sample_rate, method, len(payload), profile, fec, repetitions, **tune_options)
+    params = best['params']
+    if not best['recovered']:
+        print(f"Warning: no setting survived the '{profile}' attacks; using the lowest raw BER.")
+    print(f"Best settings: {params} (SNR {best['snr_db']:.1f} dB, raw BER {best['ber']:.4f})")
+
+    write(output_path, sample_rate, encode_tuned(data, payload, method, params))
+    print(f"Encoding complete. Stego audio saved to {output_path}")
+
+
+def decode_tuned_file(stego_path, output_payload_path, method='audio_dct'):
+    """Extracts a payload written by encode_tuned_file; the settings come from the header."""
+    _, data = read(stego_path)
+    payload, params = decode_tuned(data, method)
+    with open(output_payload_path, 'wb') as f:
+        f.write(payload)
+    print(f"Decoding complete ({params}). Payload saved as {output_payload_path}")
+
+
+if __name__ == "__main__":
+    carrier_audio = "sample_audio.wav"
+    payload_text_file = "my_secret_message.txt"
+    with open(payload_text_file, 'w') as f:
+        f.write("Tuned for this carrier.")
+
+    try:
+        encode_tuned_file(carrier_audio, payload_text_file, "stego_tuned_dct.wav", 'audio_dct')
+        decode_tuned_file("stego_tuned_dct.wav", "decoded_tuned_dct.txt", 'audio_dct')
+
+        encode_tuned_file(carrier_audio, payload_text_file, "stego_tuned_phase.wav", 'audio_phase',
+                          fec='hamming')
+        decode_tuned_file("stego_tuned_phase.wav", "decoded_tuned_phase.txt", 'audio_phase')
+
+        print("\n--- Process complete ---")
+
+    except (FileNotFoundError, ValueError) as e:
+        print("\n--- An error occurred ---")
+        print(e)
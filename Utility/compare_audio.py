@@ -0,0 +1,167 @@
+import numpy as np
+from scipy.io.wavfile import read
+from concurrent.futures import ProcessPoolExecutor
+
+
+DEFAULT_BANDS_HZ = (0, 250, 500, 1000, 2000, 4000, 8000, 16000)
+
+
+def read_wav(path):
+    """
+    Returns (sample_rate, samples) of a WAV file, memory-mapped where possible.
+    scipy cannot memory-map 24-bit (3-byte) samples; those files are read
+    into memory instead.
+    """
+    try:
+        return read(path, mmap=True)
+    except ValueError:
+        return read(path)
+
+
+def as_signed_float(samples):
+    """Samples as float32 centred on 0; 8-bit WAV samples are unsigned (silence is 128)."""
+    values = samples.astype(np.float32)
+    if samples.dtype == np.uint8:
+        values -= 128
+    return values
+
+
+def open_pair(carrier_path, stego_path):
+    """
+    Memory-maps both WAV files (see read_wav) and returns (sample_rate, carrier, stego) as
+    2-D (samples, channels) views of equal length.
+    """
+    carrier_rate, carrier = read_wav(carrier_path)
+    stego_rate, stego = read_wav(stego_path)
+
+    if carrier_rate != stego_rate:
+        raise ValueError(f"Sample rates differ! {carrier_rate} vs {stego_rate}")
+
+    carrier = carrier.reshape(len(carrier), -1)
+    stego = stego.reshape(len(stego), -1)
+
+    # DCT and phase coding only write the first channel of the carrier
+    if carrier.shape[1] != stego.shape[1]:
+        carrier, stego = carrier[:, :1], stego[:, :1]
+
+    length = min(len(carrier), len(stego))
+    return carrier_rate, carrier[:length], stego[:length]
+
+
+def compare_audio(carrier_path, stego_path, frame_size=1024, frames_per_chunk=256,
+                  bands_hz=DEFAULT_BANDS_HZ):
+    """
+    Computes SNR, segmental SNR, log-spectral distance and per-band spectral
+    deltas between a carrier and a stego WAV file.
+
+    The files are memory-mapped and processed in chunks of frames_per_chunk
+    frames; each chunk is transformed with one batched rfft, so memory use
+    does not grow with the file length.
+    """
+    sample_rate, carrier, stego = open_pair(carrier_path, stego_path)
+
+    num_channels = carrier.shape[1]
+    num_frames = len(carrier) // frame_size
+    if num_frames == 0:
+        raise ValueError("File is shorter than one analysis frame.")
+
+    window = np.hanning(frame_size).astype(np.float32)
+    freqs = np.fft.rfftfreq(frame_size, 1.0 / sample_rate)
+    band_index = np.digitize(freqs, bands_hz) - 1
+    num_bands = len(bands_hz)
+    eps = 1e-10
+
+    signal_energy = 0.0
+    noise_energy = 0.0
+    seg_snr_sum, seg_snr_count = 0.0, 0
+    lsd_sum, lsd_count = 0.0, 0
+    carrier_band_power = np.zeros(num_bands)
+    stego_band_power = np.zeros(num_bands)
+
+    chunk_samples = frames_per_chunk * frame_size
+    for start in range(0, num_frames * frame_size, chunk_samples):
+        end = min(start + chunk_samples, num_frames * frame_size)
+
+        # (frames, frame_size, channels) -> (frames * channels, frame_size)
+        x = as_signed_float(carrier[start:end]).reshape(-1, frame_size, num_channels)
+        y = as_signed_float(stego[start:end]).reshape(-1, frame_size, num_channels)
+        x = x.transpose(0, 2, 1).reshape(-1, frame_size)
+        y = y.transpose(0, 2, 1).reshape(-1, frame_size)
+
+        frame_signal = np.sum(x.astype(np.float64) ** 2, axis=1)
+        frame_noise = np.sum((x - y).astype(np.float64) ** 2, axis=1)
+        signal_energy += frame_signal.sum()
+        noise_energy += frame_noise.sum()
+
+        # Segmental SNR ignores silent frames and clamps each frame to [-10, 35] dB
+        active = frame_signal > eps
+        frame_snr = 10 * np.log10((frame_signal[active] + eps) / (frame_noise[active] + eps))
+        seg_snr_sum += np.clip(frame_snr, -10, 35).sum()
+        seg_snr_count += int(active.sum())
+
+        power_x = np.abs(np.fft.rfft(x * window, axis=1)) ** 2
+        power_y = np.abs(np.fft.rfft(y * window, axis=1)) ** 2
+
+        log_ratio = 10 * np.log10((power_x + eps) / (power_y + eps))
+        lsd_sum += np.sqrt(np.mean(log_ratio ** 2, axis=1)).sum()
+        lsd_count += len(log_ratio)
+
+        carrier_band_power += np.bincount(band_index, weights=power_x.sum(axis=0),
+                                          minlength=num_bands)
+        stego_band_power += np.bincount(band_index, weights=power_y.sum(axis=0),
+                                        minlength=num_bands)
+
+    snr = float('inf') if noise_energy == 0 else float(10 * np.log10(signal_energy / noise_energy))
+    band_deltas = 10 * np.log10((stego_band_power + eps) / (carrier_band_power + eps))
+
+    band_labels = [f"{low}-{high}" for low, high in zip(bands_hz, bands_hz[1:])]
+    band_labels.append(f"{bands_hz[-1]}+")
+
+    return {
+        'carrier': carrier_path,
+        'stego': stego_path,
+        'snr': snr,
+        'segmental_snr': float(seg_snr_sum / seg_snr_count) if seg_snr_count else float('inf'),
+        'lsd': float(lsd_sum / lsd_count),
+        'band_deltas_db': dict(zip(band_labels, band_deltas.tolist())),
+    }
+
+
+def _compare_pair(args):
+    return compare_audio(*args)
+
+
+def compare_audio_batch(pairs, workers=None, frame_size=1024):
+    """Compares a list of (carrier_path, stego_path) pairs in a process pool."""
+    jobs = [(carrier_path, stego_path, frame_size) for carrier_path, stego_path in pairs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_compare_pair, jobs))
+
+
+def passes_threshold(result, min_snr=30.0, max_lsd=1.0):
+    """Returns True if a stego file is within the given imperceptibility limits."""
+    return result['snr'] >= min_snr and result['lsd'] <= max_lsd
+
+
+def print_report(result):
+    print(f"{result['stego']}: SNR={result['snr']:.2f} dB  "
+          f"SegSNR={result['segmental_snr']:.2f} dB  LSD={result['lsd']:.3f} dB")
+    for band, delta in result['band_deltas_db'].items():
+        print(f"  {band:>12} Hz: {delta:+.3f} dB")
+
+
+if __name__ == "__main__":
+    carrier_audio = "sample_audio.wav"
+    stego_outputs = ["stego_audio_output.wav", "stego_2bit_output.wav",
+                     "stego_dct_output.wav", "stego_phase_output.wav"]
+
+    try:
+        results = compare_audio_batch([(carrier_audio, stego) for stego in stego_outputs])
+        for result in results:
+            print_report(result)
+            print("  PASS" if passes_threshold(result) else "  FAIL")
+
+    except FileNotFoundError as e:
+        print(f"Error: Could not find audio file. {e}")
+    except ValueError as e:
+        print(f"Error: {e}")
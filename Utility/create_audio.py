@@ -1,29 +1,145 @@
-
+import numpy as np
+from scipy.signal import lfilter
 import wave
-import struct
-import math
 import os
 
-payload_audio_file = 'my_secret_audio.wav'
-sample_rate = 44100.0 # samples per second
-duration = 1.0 # second
-frequency = 440.0 # Hz
 
-try:
-    with wave.open(payload_audio_file, 'wb') as wf:
-        wf.setnchannels(1) # mono
-        wf.setsampwidth(2) # 16-bit (2 bytes) per sample
+# Paul Kellet's economy pink noise filter (-3 dB/octave)
+PINK_B = [0.049922035, -0.095993537, 0.050612699, -0.004408786]
+PINK_A = [1.0, -2.494956002, 2.017265875, -0.522189400]
+# standard deviation of the filter output for unit white noise input
+PINK_STD = 0.0861
+
+
+class SignalGenerator:
+    """
+    Produces one channel of a test signal block by block.
+    All state (phase position, noise RNG, filter memory) is kept between
+    blocks, so the output does not depend on the block size.
+    """
+
+    def __init__(self, kind, sample_rate, duration, rng, frequency=440.0,
+                 end_frequency=8000.0, amplitude=0.9):
+        if kind not in ('tone', 'chirp', 'white', 'pink'):
+            raise ValueError(f"Unknown signal type: {kind}")
+        self.kind = kind
+        self.sample_rate = sample_rate
+        self.duration = duration
+        self.rng = rng
+        self.frequency = frequency
+        self.end_frequency = end_frequency
+        self.amplitude = amplitude
+        self.position = 0
+        self.pink_state = np.zeros(len(PINK_A) - 1)
+
+    def next_block(self, num_samples):
+        t = (self.position + np.arange(num_samples)) / self.sample_rate
+        self.position += num_samples
+
+        if self.kind == 'tone':
+            block = np.sin(2 * np.pi * self.frequency * t)
+        elif self.kind == 'chirp':
+            # linear sweep from frequency to end_frequency over the whole duration
+            sweep_rate = (self.end_frequency - self.frequency) / self.duration
+            block = np.sin(2 * np.pi * (self.frequency * t + 0.5 * sweep_rate * t * t))
+        elif self.kind == 'white':
+            block = np.clip(self.rng.standard_normal(num_samples) / 3.0, -1.0, 1.0)
+        else:
+            white = self.rng.standard_normal(num_samples)
+            block, self.pink_state = lfilter(PINK_B, PINK_A, white, zi=self.pink_state)
+            block = np.clip(block / (3.0 * PINK_STD), -1.0, 1.0)
+
+        return self.amplitude * block
+
+
+def float_to_pcm(block, sample_width):
+    """Converts a float block in [-1, 1] (samples x channels) to little-endian PCM bytes."""
+    if sample_width == 1:
+        # 8-bit WAV is unsigned
+        return np.round(block * 127 + 128).astype(np.uint8).tobytes()
+    if sample_width == 2:
+        return np.round(block * 32767).astype('<i2').tobytes()
+    if sample_width == 3:
+        as_int = np.round(block * 8388607).astype('<i4')
+        # keep the low 3 bytes of every little-endian 32-bit sample
+        return as_int.view(np.uint8).reshape(-1, 4)[:, :3].tobytes()
+    if sample_width == 4:
+        return np.round(block * 2147483647).astype('<i4').tobytes()
+    raise ValueError(f"Unsupported sample width: {sample_width} bytes")
+
+
+def create_audio(output_path, signals=('tone',), duration=1.0, sample_rate=44100,
+                 sample_width=2, block_size=65536, seed=0, **signal_options):
+    """
+    Writes a WAV file with one channel per entry in signals.
+
+    Each entry is a signal type ('tone', 'chirp', 'white', 'pink') or a
+    (type, options) tuple. 'mix:a+b' entries sum several types in one channel.
+    Audio is synthesized and written in blocks of block_size samples, so
+    hour-long files never have to fit in memory.
+    """
+    total_samples = int(duration * sample_rate)
+
+    layout = []
+    for signal in signals:
+        kind, options = (signal, {}) if isinstance(signal, str) else signal
+        parts = kind[4:].split('+') if kind.startswith('mix:') else [kind]
+        layout.append((parts, {**signal_options, **options}))
+
+    # Every generator draws from its own child stream, so one channel's noise
+    # does not depend on how its blocks interleave with the other channels'
+    streams = iter(np.random.SeedSequence(seed).spawn(sum(len(parts) for parts, _ in layout)))
+    channels = [[SignalGenerator(part, sample_rate, duration,
+                                 np.random.default_rng(next(streams)), **options)
+                 for part in parts] for parts, options in layout]
+
+    with wave.open(output_path, 'wb') as wf:
+        wf.setnchannels(len(channels))
+        wf.setsampwidth(sample_width)
         wf.setframerate(sample_rate)
-        
-        n_samples = int(duration * sample_rate)
-        for i in range(n_samples):
-            # Calculate the sample value
-            value = int(32767.0 * math.sin(2.0 * math.pi * frequency * (i / sample_rate)))
-            # Pack the value as 2-byte signed integer
-            data = struct.pack('<h', value)
-            wf.writeframesraw(data)
-            
-    print(f"Created '{payload_audio_file}' as the payload.")
-except Exception as e:
-    print(f"Could not create dummy audio file: {e}")
 
+        written = 0
+        while written < total_samples:
+            n = min(block_size, total_samples - written)
+            block = np.empty((n, len(channels)))
+            for c, generators in enumerate(channels):
+                block[:, c] = sum(g.next_block(n) for g in generators) / len(generators)
+            wf.writeframesraw(float_to_pcm(block, sample_width))
+            written += n
+
+    print(f"Created '{output_path}' ({duration:.1f} s, {len(channels)} ch, "
+          f"{sample_width * 8}-bit, {sample_rate} Hz).")
+
+
+BENCHMARK_CORPUS = [
+    ('tone_440_mono.wav', {'signals': ('tone',)}),
+    ('chirp_mono.wav', {'signals': ('chirp',), 'frequency': 20.0, 'end_frequency': 20000.0}),
+    ('white_mono.wav', {'signals': ('white',)}),
+    ('pink_stereo.wav', {'signals': ('pink', 'pink')}),
+    ('mixed_stereo.wav', {'signals': ('mix:tone+pink', 'mix:chirp+white')}),
+    ('tone_24bit_48k.wav', {'signals': ('tone',), 'sample_width': 3, 'sample_rate': 48000}),
+    ('quiet_tone_8bit.wav', {'signals': ('tone',), 'sample_width': 1, 'amplitude': 0.1}),
+]
+
+
+def create_corpus(output_dir, duration=60.0, seed=0):
+    """
+    Writes the benchmark carrier set to output_dir.
+    Every file gets its own seed derived from `seed`, so a corpus is fully
+    reproducible and files can be regenerated individually.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    for index, (name, options) in enumerate(BENCHMARK_CORPUS):
+        create_audio(os.path.join(output_dir, name), duration=duration,
+                     seed=seed + index, **options)
+
+
+if __name__ == "__main__":
+    payload_audio_file = 'my_secret_audio.wav'
+
+    try:
+        create_audio(payload_audio_file, signals=('tone',), duration=1.0, frequency=440.0,
+                     amplitude=1.0)
+        print(f"Created '{payload_audio_file}' as the payload.")
+    except Exception as e:
+        print(f"Could not create dummy audio file: {e}")
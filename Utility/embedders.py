@@ -0,0 +1,706 @@
+import numpy as np
+from scipy import fft
+from scipy.fftpack import idct
+from scipy.signal import fftconvolve
+from scipy.ndimage import minimum_filter1d
+from functools import partial
+from itertools import chain
+
+from stego_header import (HEADER_BITS, frame_payload, parse_header, verify_payload,
+                          bits_to_bytes, embed_lsb, extract_lsb)
+from fec import protect_payload, recover_payload, max_payload_bytes, coded_length, decode_fec
+
+
+def as_payload(payload):
+    """Returns bytes for any bytes-like payload (bytes, bytearray, memoryview, NumPy buffer)."""
+    return payload if isinstance(payload, bytes) else bytes(memoryview(payload))
+
+
+def as_carrier(carrier, buffer_dtype):
+    """
+    Returns the carrier as a NumPy array. Arrays are used as they are; other
+    buffer-protocol objects (raw PCM bytes, bytearray, memoryview) are viewed
+    as a flat array of buffer_dtype without copying.
+    """
+    if isinstance(carrier, np.ndarray):
+        return carrier
+    if isinstance(carrier, (bytes, bytearray, memoryview)):
+        return np.frombuffer(carrier, dtype=buffer_dtype)
+    return np.asarray(carrier)
+
+
+def first_channel(data):
+    """Audio samples of the first channel; (samples, channels) arrays are reduced to 1-D."""
+    return data[:, 0] if data.ndim > 1 else data
+
+
+class Embedder:
+    """
+    Common in-memory interface of all embedding methods:
+
+        capacity(carrier)        -> largest payload in bytes
+        embed(carrier, payload)  -> stego array (the carrier is not modified)
+        extract(stego)           -> payload bytes
+
+    Carriers are NumPy arrays or raw buffers, payloads are any bytes-like
+    object. Nothing touches the disk, so embed -> attack -> extract pipelines
+    can run entirely in memory. extract raises ValueError if no valid payload
+    is found.
+    """
+
+    method = None
+    # dtype used to view raw buffers passed as carriers
+    buffer_dtype = np.int16
+
+    def capacity(self, carrier):
+        raise NotImplementedError
+
+    def embed(self, carrier, payload):
+        raise NotImplementedError
+
+    def extract(self, stego):
+        raise NotImplementedError
+
+    def check_capacity(self, carrier, payload):
+        capacity = self.capacity(carrier)
+        if len(payload) > capacity:
+            raise ValueError(f"Payload is too large for this carrier! \n"
+                             f"Needed: {len(payload)} bytes \n"
+                             f"Have:   {capacity} bytes")
+
+
+class LSBEmbedder(Embedder):
+    """
+    Replaces the lowest bits_per_sample bits of every carrier value, in the
+    carrier's flattened (row-major) order. Works on any integer array: images
+    (height, width, channels) as well as audio (samples, channels).
+    """
+
+    def __init__(self, method='image_lsb', bits_per_sample=1):
+        self.method = method
+        self.bits_per_sample = bits_per_sample
+        self.buffer_dtype = np.uint8 if method.startswith('image') else np.int16
+
+    def capacity(self, carrier):
+        data = as_carrier(carrier, self.buffer_dtype)
+        return max(0, (data.size * self.bits_per_sample - HEADER_BITS) // 8)
+
+    def embed(self, carrier, payload):
+        data = as_carrier(carrier, self.buffer_dtype)
+        payload = as_payload(payload)
+        if not np.issubdtype(data.dtype, np.integer):
+            raise ValueError(f"LSB embedding needs integer samples, not {data.dtype}.")
+        self.check_capacity(data, payload)
+
+        stego = data.copy()
+        embed_lsb(stego.reshape(-1), frame_payload(self.method, payload), self.bits_per_sample)
+        return stego
+
+    def extract(self, stego):
+        flat = as_carrier(stego, self.buffer_dtype).reshape(-1)
+        header = parse_header(extract_lsb(flat, HEADER_BITS, self.bits_per_sample), self.method)
+
+        total_bits = HEADER_BITS + header['length'] * 8
+        if len(flat) * self.bits_per_sample < total_bits:
+            raise ValueError(f"Carrier is corrupted or incomplete. Expected {total_bits} bits, "
+                             f"found {len(flat) * self.bits_per_sample}.")
+
+        payload = bits_to_bytes(extract_lsb(flat, total_bits, self.bits_per_sample)[HEADER_BITS:])
+        verify_payload(header, payload)
+        return payload
+
+
+def dct_basis(frame_size, coeff_index):
+    """
+    Returns the orthonormal DCT-II basis vector of one coefficient.
+    With norm='ortho' the coefficient of a frame is its dot product with this
+    vector, and changing only that coefficient adds a multiple of it to the
+    frame, so no full DCT/IDCT per frame is needed.
+    """
+    unit = np.zeros(frame_size)
+    unit[coeff_index] = 1.0
+    return idct(unit, type=2, norm='ortho')
+
+
+def embed_dct_frames(frames, bits, basis, quantization_step):
+    """Sets the parity of each frame's quantized coefficient to its bit, in place (float frames)."""
+    # Quantization
+    original_coeff = frames @ basis
+    quantized_level = np.round(original_coeff / quantization_step)
+
+    # If the parity of the level (even/odd) doesn't match the bit, move to the
+    # closest level with the correct parity
+    wrong_parity = (quantized_level % 2) != bits
+    step_down = quantized_level * quantization_step > original_coeff
+    quantized_level[wrong_parity & step_down] -= 1
+    quantized_level[wrong_parity & ~step_down] += 1
+
+    frames += np.outer(quantized_level * quantization_step - original_coeff, basis)
+
+
+def dct_soft_bits(data, frame_size=1024, coeff_index=430, quantization_step=80.0):
+    """
+    Returns one soft value per frame: the sign is the parity bit (positive = 1)
+    and the magnitude is 1 when the coefficient sits on a quantization level and
+    0 when it is halfway between two levels.
+    """
+    num_frames = len(data) // frame_size
+    frames = np.asarray(data[:num_frames * frame_size], dtype=float).reshape(num_frames, frame_size)
+    scaled = (frames @ dct_basis(frame_size, coeff_index)) / quantization_step
+
+    quantized_level = np.round(scaled)
+    confidence = 1 - 2 * np.abs(scaled - quantized_level)
+    return np.where(quantized_level % 2 == 1, confidence, -confidence)
+
+
+class DCTEmbedder(Embedder):
+    """
+    Hides one bit per frame in the parity of a quantized mid-range DCT
+    coefficient of the first audio channel. The stego signal is that channel
+    (1-D), in the carrier's dtype and clipped to the 16-bit range.
+    fec='hamming' or 'repetition' adds error correction (see fec.py);
+    extract must use the same settings.
+    """
+
+    method = 'audio_dct'
+
+    def __init__(self, frame_size=1024, coeff_index=430, quantization_step=80.0,
+                 fec=None, repetitions=3):
+        self.frame_size = frame_size
+        self.coeff_index = coeff_index
+        self.quantization_step = quantization_step
+        self.fec = fec
+        self.repetitions = repetitions
+
+    def capacity(self, carrier):
+        num_frames = len(first_channel(as_carrier(carrier, self.buffer_dtype))) // self.frame_size
+        return max_payload_bytes(num_frames, self.fec, self.repetitions)
+
+    def samples_needed(self, num_bits):
+        """Length of the signal segment that holds num_bits bits."""
+        return num_bits * self.frame_size
+
+    def embed_bits(self, data, bits):
+        """Embeds raw bits into the start of a 1-D signal; returns a float copy (not rounded)."""
+        stego_data = np.asarray(data, dtype=float).copy()
+        num_used = len(bits)
+        # one row per frame that carries a bit (a view into stego_data)
+        frames = stego_data[:num_used * self.frame_size].reshape(num_used, self.frame_size)
+        embed_dct_frames(frames, bits, dct_basis(self.frame_size, self.coeff_index),
+                         self.quantization_step)
+        return stego_data
+
+    def soft_bits(self, data):
+        return dct_soft_bits(data, self.frame_size, self.coeff_index, self.quantization_step)
+
+    def embed(self, carrier, payload):
+        data = first_channel(as_carrier(carrier, self.buffer_dtype))
+        payload = as_payload(payload)
+        self.check_capacity(data, payload)
+        stego_data = self.embed_bits(data, protect_payload(self.method, payload, self.fec,
+                                                           self.repetitions))
+        return self.to_pcm(stego_data, data.dtype)
+
+    def to_pcm(self, stego_data, dtype):
+        # Clip values to the valid 16-bit range before converting back to integer
+        return np.clip(np.round(stego_data), -32768, 32767).astype(dtype)
+
+    def extract(self, stego):
+        data = first_channel(as_carrier(stego, self.buffer_dtype))
+        _, payload = recover_payload(self.soft_bits(data), self.method, self.fec, self.repetitions)
+        return payload
+
+
+# Phase coding: every data bin is pushed until the decoder's soft value
+# (see phase_soft_bits) has the right sign with this much of the bin's
+# original strength behind it ...
+PHASE_MARGIN = 0.5
+# ... or at least this many LSBs (per unit of window energy), so bins the
+# carrier leaves empty (tonal carriers) still survive 16-bit rounding
+PHASE_FLOOR_LSB = 4.0
+# Correction passes per block, and how far each pass overshoots. Neighbouring
+# frames share half their samples, so a pass only lands part of its correction.
+PHASE_ITERATIONS = 12
+PHASE_RELAXATION = 1.5
+# Frames on either side of a block that a streaming encoder re-embeds along
+# with it, so that the block comes out exactly as in a whole-signal embed
+PHASE_CONTEXT = PHASE_ITERATIONS + 1
+
+
+def phase_bins(freq_range_to_modify):
+    """
+    Data bins of the modified band: every other bin, so the Hann window's
+    leakage from one data bin lands on the unused bins in between.
+    """
+    low, high = freq_range_to_modify
+    return np.arange(low + 1, high - 1, 2)
+
+
+def frame_centre_signs(frame_size):
+    """
+    (-1)^k per rfft bin. Multiplying a spectrum by it moves the phase
+    reference from the first sample to the centre of the frame, where the
+    Hann window's leakage between neighbouring bins is real and positive.
+    """
+    return (-1.0) ** np.arange(frame_size // 2 + 1)
+
+
+def overlap_add(frames, hop_size):
+    """Overlap-adds half-overlapping frames into a signal of (frames + 1) hops."""
+    signal = np.zeros((len(frames) + 1) * hop_size, dtype=frames.dtype)
+    # even frames do not overlap each other, and neither do odd frames, so
+    # each half is added as one contiguous block
+    for first in (0, 1):
+        block = frames[first::2].ravel()
+        signal[first * hop_size:first * hop_size + len(block)] += block
+    return signal
+
+
+def embed_phase_frames(segment, frame_bits, frame_size, data_bins):
+    """
+    Embeds one row of frame_bits (1, 0, or -1 for "no bit") into each
+    half-overlapping frame of a 1-D float segment of (rows + 1) hops, in place.
+
+    A '1' needs a positive imaginary part in the frame-centred spectrum of the
+    data bin, a '0' a negative one. Each pass measures the frames exactly as
+    phase_soft_bits does, and adds the missing imaginary part of every bin that
+    falls short of its target, spread back over the samples by a least-squares
+    overlap-add. Bins that already decode correctly, and everything outside
+    the data bins, are left alone.
+
+    A pass only reaches one frame further, so after PHASE_ITERATIONS passes
+    a sample depends on nothing more than PHASE_CONTEXT frames on either
+    side (see PhaseEmbedder.embed_stream).
+    """
+    hop_size = frame_size // 2
+    window = np.hanning(frame_size).astype(segment.dtype)
+    centre = frame_centre_signs(frame_size).astype(segment.dtype)
+    sign = np.where(frame_bits == 1, 1.0, np.where(frame_bits == 0, -1.0, 0.0))
+    if not sign.any():
+        return
+
+    # The window energy the overlap-add divides by; where only one frame
+    # covers a sample it is clamped to the two-frame minimum (0.5)
+    norm = np.maximum(overlap_add(np.tile(window * window, (len(frame_bits), 1)), hop_size), 0.5)
+
+    def spectrum():
+        frames = np.lib.stride_tricks.sliding_window_view(segment, frame_size)[::hop_size]
+        return fft.rfft(frames * window, axis=1) * centre
+
+    spec = spectrum()
+    mags = np.abs(spec)
+    neighbourhood = mags[:, data_bins - 1] + mags[:, data_bins] + mags[:, data_bins + 1]
+    target = PHASE_MARGIN * neighbourhood / 3 + PHASE_FLOOR_LSB * np.sqrt(np.sum(window * window))
+
+    for _ in range(PHASE_ITERATIONS):
+        shortfall = np.maximum(0.0, target - sign * spec.imag[:, data_bins]) * (sign != 0)
+        if not shortfall.any():
+            break
+        correction = np.zeros_like(spec)
+        correction[:, data_bins] = 1j * sign * shortfall * PHASE_RELAXATION
+        delta = overlap_add(fft.irfft(correction * centre, n=frame_size, axis=1) * window,
+                            hop_size) / norm
+        segment += delta[:len(segment)]
+        spec = spectrum()
+
+
+def phase_soft_bits(stego_data, frame_size=2048, freq_range_to_modify=(40, 100)):
+    """
+    Returns one soft value per data bin. The sign is the bit (positive = 1).
+    The magnitude is the distance from the 0/180 degree decision boundary,
+    sin(phase), scaled by how strong the bin is against its two neighbours,
+    since weak bins are the ones that leakage flips.
+    """
+    hop_size = frame_size // 2
+    num_frames = (len(stego_data) - frame_size) // hop_size + 1
+    if num_frames <= 0:
+        return np.zeros(0)
+
+    data_bins = phase_bins(freq_range_to_modify)
+    window = np.hanning(frame_size)
+    frames = np.lib.stride_tricks.sliding_window_view(stego_data, frame_size)[::hop_size][:num_frames]
+    spectrum = np.fft.rfft(frames * window, axis=1) * frame_centre_signs(frame_size)
+
+    mags = np.abs(spectrum)
+    neighbourhood = mags[:, data_bins - 1] + mags[:, data_bins] + mags[:, data_bins + 1]
+    return (spectrum.imag[:, data_bins] / (neighbourhood + 1e-9)).ravel()
+
+
+class PhaseEmbedder(Embedder):
+    """
+    Phase Coding on the first audio channel: one bit per data bin of every
+    half-overlapping frame. The stego signal is that channel (1-D). A clean
+    channel decodes without bit errors; use fec='hamming' against attacks.
+    """
+
+    method = 'audio_phase'
+
+    def __init__(self, frame_size=2048, freq_range_to_modify=(40, 100), fec=None, repetitions=3):
+        self.frame_size = frame_size
+        self.freq_range_to_modify = freq_range_to_modify
+        self.fec = fec
+        self.repetitions = repetitions
+
+    def num_frames(self, data):
+        return max(0, (len(data) - self.frame_size) // (self.frame_size // 2) + 1)
+
+    def capacity(self, carrier):
+        data = first_channel(as_carrier(carrier, self.buffer_dtype))
+        data_bins = phase_bins(self.freq_range_to_modify)
+        return max_payload_bytes(self.num_frames(data) * len(data_bins), self.fec, self.repetitions)
+
+    def samples_needed(self, num_bits):
+        """Length of the signal segment that holds num_bits bits."""
+        data_bins = phase_bins(self.freq_range_to_modify)
+        num_frames = -(-num_bits // len(data_bins))
+        return (num_frames + 1) * (self.frame_size // 2)
+
+    def frame_bits(self, data, bits):
+        """Bits per used frame (one row each), padded with -1 ("no bit")."""
+        bits_per_frame = len(phase_bins(self.freq_range_to_modify))
+        used_frames = min(-(-len(bits) // bits_per_frame), self.num_frames(data))
+        frame_bits = np.full(used_frames * bits_per_frame, -1, dtype=np.int8)
+        frame_bits[:len(bits)] = bits[:len(frame_bits)]
+        return frame_bits.reshape(used_frames, bits_per_frame)
+
+    def embed_stream(self, data, bits, block_frames=64, dtype=np.float64):
+        """
+        Embeds raw bits into the start of a 1-D signal and yields the stego
+        signal (float, not converted to PCM) in consecutive pieces.
+
+        Frames are processed block_frames at a time. Each block is embedded
+        again from the carrier together with PHASE_CONTEXT frames on either
+        side, and only its own samples are kept, so the output is the same as
+        embed_bits' for any block size (up to the precision of dtype). Only a
+        block of the carrier is converted to dtype at a time, so data can be a
+        memory-mapped file.
+        """
+        hop_size = self.frame_size // 2
+        data_bins = phase_bins(self.freq_range_to_modify)
+        frame_bits = self.frame_bits(data, bits)
+        used_frames = len(frame_bits)
+
+        for first in range(0, used_frames, block_frames):
+            last = min(first + block_frames, used_frames)
+            low = max(0, first - PHASE_CONTEXT)
+            high = min(used_frames, last + PHASE_CONTEXT)
+            segment = np.array(data[low * hop_size:(high + 1) * hop_size], dtype=dtype)
+            embed_phase_frames(segment, frame_bits[low:high], self.frame_size, data_bins)
+            # the last block also ends with the second half of the last frame
+            end = last + 1 if last == used_frames else last
+            yield segment[(first - low) * hop_size:(end - low) * hop_size]
+
+        # The rest of the carrier is unchanged
+        rest = (used_frames + 1) * hop_size if used_frames else 0
+        for start in range(rest, len(data), block_frames * hop_size):
+            yield np.asarray(data[start:start + block_frames * hop_size], dtype=dtype)
+
+    def embed_bits(self, data, bits):
+        """
+        Embeds raw bits into the start of a 1-D signal and returns the float
+        stego signal (not converted to PCM).
+        """
+        frame_bits = self.frame_bits(data, bits)
+        stego_data = np.array(data, dtype=float)
+        if len(frame_bits):
+            segment = stego_data[:(len(frame_bits) + 1) * (self.frame_size // 2)]
+            embed_phase_frames(segment, frame_bits, self.frame_size,
+                               phase_bins(self.freq_range_to_modify))
+        return stego_data
+
+    def soft_bits(self, data):
+        return phase_soft_bits(np.asarray(data, dtype=float), self.frame_size,
+                               self.freq_range_to_modify)
+
+    def embed(self, carrier, payload):
+        data = first_channel(as_carrier(carrier, self.buffer_dtype))
+        payload = as_payload(payload)
+        self.check_capacity(data, payload)
+        stego_data = self.embed_bits(data, protect_payload(self.method, payload, self.fec,
+                                                           self.repetitions))
+        return self.to_pcm(stego_data, data.dtype)
+
+    def to_pcm(self, stego_data, dtype=np.int16):
+        # Embedding keeps the carrier's level; only peaks that would leave the
+        # 16-bit range are turned down (a silent signal stays silent)
+        limited = np.concatenate(list(limit_peaks([stego_data])) or [np.zeros(0)])
+        return np.clip(np.round(limited), -32768, 32767).astype(dtype)
+
+    def extract(self, stego):
+        data = first_channel(as_carrier(stego, self.buffer_dtype))
+        _, payload = recover_payload(self.soft_bits(data), self.method, self.fec, self.repetitions)
+        return payload
+
+
+def limit_peaks(pieces, peak=32767, attack=256, release=8192):
+    """
+    Look-ahead peak limiter for a stream of float signal pieces.
+
+    Yields the same signal, re-cut into pieces, with a gain of at most 1 that
+    keeps every sample within +-peak. The gain each sample needs is held for
+    `attack` samples before it (a running minimum over the look-ahead) and
+    then averaged over `attack` samples, so the gain glides down and has
+    reached the required level at the first sample that would clip. It
+    recovers towards 1 at no more than 1/release per sample afterwards.
+    `attack` samples are held back as look-ahead.
+    """
+    step = 1.0 / release
+    gain = 1.0
+    buffered = np.zeros(0)
+    history = None
+    # None marks the end of the stream, where the look-ahead is flushed
+    for piece in chain(pieces, [None]):
+        if piece is not None:
+            buffered = np.concatenate([buffered, piece]) if len(buffered) else np.asarray(piece)
+        ready = len(buffered) if piece is None else len(buffered) - attack
+        if ready <= 0:
+            continue
+
+        required = peak / np.maximum(np.abs(buffered), peak)
+        lookahead = np.concatenate([required, np.ones(attack + ready - len(required))])
+        # held[n] = lowest gain needed in samples n .. n + attack
+        held = minimum_filter1d(lookahead, attack + 1, origin=-((attack + 1) // 2))[:ready]
+        if history is None:
+            # nothing before the first sample to ramp down from
+            history = np.full(attack, held[0])
+        # averaging held values over the attack samples up to n never exceeds
+        # what sample n needs, since all of them cover it
+        sums = np.cumsum(np.concatenate([[0.0], history, held]))
+        envelope = (sums[attack + 1:] - sums[:-attack - 1]) / (attack + 1)
+        history = np.concatenate([history, held])[-attack:]
+
+        # release: gain[n] = min over k <= n of envelope[k] + (n - k) * step
+        positions = np.arange(ready)
+        recovered = np.minimum.accumulate(envelope - positions * step) + positions * step
+        gains = np.minimum(recovered, gain + (positions + 1) * step)
+        gain = float(gains[-1])
+
+        yield buffered[:ready] * gains.astype(buffered.dtype)
+        buffered = buffered[ready:]
+
+
+def band_limited_noise(rng_seed, count, length, band, skip=0):
+    """
+    count rows of seeded Gaussian noise, restricted to the rfft bins
+    band[0]..band[1] and scaled to unit RMS, so <code, code> = length.
+    The first skip rows of the stream are drawn and dropped unfiltered.
+    """
+    noise = np.random.default_rng(rng_seed).standard_normal((skip + count, length))[skip:]
+    spectrum = fft.rfft(noise, axis=1)
+    spectrum[:, :band[0]] = 0
+    spectrum[:, band[1]:] = 0
+    codes = fft.irfft(spectrum, n=length, axis=1)
+    return codes / np.sqrt(np.mean(codes ** 2, axis=1, keepdims=True))
+
+
+def pn_codes(seed, start, count, chip_length, band):
+    """
+    Spreading codes of bits start .. start + count - 1: rows of one noise
+    stream seeded by (seed, 1), drawn in a single call. The generator fills
+    rows in order, so a range is regenerated by skipping the rows before it.
+    """
+    return band_limited_noise([seed, 1], count, chip_length, band, skip=start)
+
+
+def sync_candidates(signal, code, max_candidates=8, chunk_size=1 << 20):
+    """
+    Start positions of the sync code in signal, strongest first.
+
+    The cross-correlation with the code is computed for every lag with FFT
+    convolution, chunk by chunk (overlapping by the code length), so the
+    cost is O(n log n) and memory stays bounded for long recordings. Each
+    lag is normalized by the signal energy under the code, which makes loud
+    passages no more likely to win than quiet ones. Peaks closer than one
+    code length to a stronger peak are dropped.
+    """
+    length = len(code)
+    reversed_code = code[::-1]
+    # Lags down to -length/2 are searched too, so a sync code whose first
+    # half was cropped off is still found (positions are then negative)
+    lead = length // 2
+    peaks = []
+    for start in range(-lead, max(1, len(signal) - length + 1), chunk_size):
+        segment = np.asarray(signal[max(start, 0):start + chunk_size + length - 1], dtype=float)
+        if start < 0:
+            segment = np.concatenate([np.zeros(-start), segment])
+        if len(segment) < length:
+            break
+        correlation = fftconvolve(segment, reversed_code, mode='valid')
+        energy = np.concatenate([[0.0], np.cumsum(segment ** 2)])
+        local = energy[length:] - energy[:-length]
+        score = correlation / (np.sqrt(np.maximum(local, 1e-9)) * np.sqrt(length))
+        peaks.extend((score[i], start + i) for i in strongest_peaks(score, max_candidates, length))
+
+    peaks.sort(reverse=True)
+    chosen = []
+    for score, position in peaks:
+        if all(abs(position - other) >= length for other in chosen):
+            chosen.append(position)
+        if len(chosen) == max_candidates:
+            break
+    return chosen
+
+
+def strongest_peaks(score, count, separation):
+    """Indices of up to count highest values of score, at least separation apart."""
+    score = score.copy()
+    found = []
+    for _ in range(count):
+        index = int(np.argmax(score))
+        if not np.isfinite(score[index]):
+            break
+        found.append(index)
+        score[max(0, index - separation + 1):index + separation] = -np.inf
+    return found
+
+
+class SpreadSpectrumEmbedder(Embedder):
+    """
+    Direct-sequence spread spectrum on the first audio channel.
+
+    A sync code of sync_length samples is followed by the payload bits, one
+    per chip_length samples. Bit i is sent as +code_i or -code_i, where code_i
+    is row i of a seeded band-limited noise stream in band_hz (see pn_codes).
+    The added signal follows the carrier's loudness block by block (strength
+    times the block's RMS).
+    Copies of sync + payload are repeated while the carrier has room, so a
+    cropped recording usually still holds a complete one. The stego signal
+    is that channel (1-D), clipped to the 16-bit range.
+
+    extract finds the sync code with FFT cross-correlation over the whole
+    signal (see sync_candidates), then despreads all bits at once as
+    row-wise dot products with their codes. Seed, band, chip and sync
+    lengths and fec must match between embed and extract.
+    """
+
+    method = 'audio_dsss'
+
+    def __init__(self, sample_rate=44100, chip_length=1024, band_hz=(1000, 6000), strength=0.1,
+                 sync_length=1 << 15, seed=0x5EED, fec=None, repetitions=3, repeat=True):
+        self.sample_rate = sample_rate
+        self.chip_length = chip_length
+        self.band_hz = band_hz
+        self.strength = strength
+        self.sync_length = sync_length
+        self.seed = seed
+        self.fec = fec
+        self.repetitions = repetitions
+        self.repeat = repeat
+
+    def band(self, length):
+        """band_hz as rfft bin indices for a code of the given length."""
+        return tuple(int(round(f * length / self.sample_rate)) for f in self.band_hz)
+
+    def sync_code(self):
+        return band_limited_noise([self.seed], 1, self.sync_length, self.band(self.sync_length))[0]
+
+    def capacity(self, carrier):
+        data = first_channel(as_carrier(carrier, self.buffer_dtype))
+        num_bits = max(0, len(data) - self.sync_length) // self.chip_length
+        return max_payload_bytes(num_bits, self.fec, self.repetitions)
+
+    def embed(self, carrier, payload):
+        data = first_channel(as_carrier(carrier, self.buffer_dtype))
+        payload = as_payload(payload)
+        self.check_capacity(data, payload)
+        bits = protect_payload(self.method, payload, self.fec, self.repetitions)
+
+        # one copy: sync code, then each bit times its code
+        codes = pn_codes(self.seed, 0, len(bits), self.chip_length, self.band(self.chip_length))
+        chips = (codes * (2.0 * bits[:, None] - 1)).ravel()
+        copy = np.concatenate([self.sync_code(), chips])
+
+        num_copies = len(data) // len(copy) if self.repeat else 1
+        watermark = np.zeros(len(data))
+        watermark[:num_copies * len(copy)] = np.tile(copy, num_copies)
+
+        # scale by the carrier RMS of each chip-length block (and the tail)
+        stego_data = data.astype(float)
+        blocks = -(-len(data) // self.chip_length)
+        padded = np.zeros(blocks * self.chip_length)
+        padded[:len(data)] = stego_data
+        rms = np.sqrt(np.mean(padded.reshape(blocks, self.chip_length) ** 2, axis=1))
+        # at least a few LSBs, so silent passages still carry the code
+        gain = self.strength * np.maximum(rms, 8.0)
+        stego_data += watermark * np.repeat(gain, self.chip_length)[:len(data)]
+
+        return np.clip(np.round(stego_data), -32768, 32767).astype(data.dtype)
+
+    def despread(self, signal, position, start_bit, count):
+        """Soft values (normalized correlations) of count bits of the copy starting at position."""
+        begin = position + self.sync_length + start_bit * self.chip_length
+        end = begin + count * self.chip_length
+        if begin < 0 or end > len(signal):
+            raise ValueError("Payload is not complete in this signal.")
+        blocks = np.asarray(signal[begin:end], dtype=float).reshape(count, self.chip_length)
+        codes = pn_codes(self.seed, start_bit, count, self.chip_length, self.band(self.chip_length))
+        correlation = np.einsum('ij,ij->i', blocks, codes)
+        return correlation / (np.linalg.norm(blocks, axis=1) * np.sqrt(self.chip_length) + 1e-9)
+
+    def decode_at(self, signal, position):
+        """Reads the copy whose sync code starts at position; raises ValueError if it is not valid."""
+        if self.fec is None:
+            header_length = HEADER_BITS
+        else:
+            header_length = coded_length(HEADER_BITS, self.fec, self.repetitions)
+        header_soft = self.despread(signal, position, 0, header_length)
+
+        if self.fec is None:
+            header = parse_header((header_soft > 0).astype(np.uint8), self.method)
+            payload_length = header['length'] * 8
+        else:
+            header = parse_header(decode_fec(header_soft, HEADER_BITS, self.fec, self.repetitions),
+                                  self.method)
+            payload_length = coded_length(header['length'] * 8, self.fec, self.repetitions)
+
+        payload_soft = self.despread(signal, position, header_length, payload_length)
+        _, payload = recover_payload(np.concatenate([header_soft, payload_soft]), self.method,
+                                     self.fec, self.repetitions)
+        return payload
+
+    def extract(self, stego):
+        data = first_channel(as_carrier(stego, self.buffer_dtype))
+        if len(data) < self.sync_length:
+            raise ValueError("Signal is shorter than the sync code.")
+
+        for position in sync_candidates(data, self.sync_code()):
+            try:
+                return self.decode_at(data, position)
+            except ValueError:
+                continue
+        raise ValueError("No spread-spectrum payload found.")
+
+
+EMBEDDERS = {
+    'image_lsb': partial(LSBEmbedder, 'image_lsb', 1),
+    'audio_lsb': partial(LSBEmbedder, 'audio_lsb', 1),
+    'audio_lsb_2bit': partial(LSBEmbedder, 'audio_lsb_2bit', 2),
+    'audio_dct': DCTEmbedder,
+    'audio_phase': PhaseEmbedder,
+    'audio_dsss': SpreadSpectrumEmbedder,
+}
+
+
+def get_embedder(method, **options):
+    """
+    Returns the embedder for a method name (the names used in the stego header),
+    e.g. get_embedder('audio_dct', fec='hamming').
+    """
+    if method not in EMBEDDERS:
+        raise ValueError(f"Unknown embedding method '{method}'. Use one of: {', '.join(EMBEDDERS)}")
+    return EMBEDDERS[method](**options)
+
+
+if __name__ == "__main__":
+    # embed -> attack -> extract without touching the disk
+    rng = np.random.default_rng(0)
+    audio = (rng.standard_normal(44100 * 10) * 3000).astype(np.int16)
+    image = rng.integers(0, 256, (200, 300, 3), dtype=np.uint8)
+    message = b"Hello! I am superman"
+
+    for method, carrier in [('image_lsb', image), ('audio_lsb', audio), ('audio_lsb_2bit', audio),
+                            ('audio_dct', audio), ('audio_phase', audio), ('audio_dsss', audio)]:
+        embedder = get_embedder(method, fec='hamming') if method == 'audio_phase' else get_embedder(method)
+        stego = embedder.embed(carrier, message)
+        print(f"{method}: capacity {embedder.capacity(carrier)} bytes, "
+              f"recovered {embedder.extract(stego) == message}")
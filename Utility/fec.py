@@ -0,0 +1,138 @@
+import numpy as np
+
+from stego_header import (HEADER_BITS, build_header, frame_payload, parse_header, verify_payload,
+                          bytes_to_bits, bits_to_bytes)
+
+
+# Hamming(7,4) generator matrix, codeword = [d1 d2 d3 d4 p1 p2 p3]
+HAMMING_G = np.array([
+    [1, 0, 0, 0, 1, 1, 0],
+    [0, 1, 0, 0, 1, 0, 1],
+    [0, 0, 1, 0, 0, 1, 1],
+    [0, 0, 0, 1, 1, 1, 1],
+], dtype=np.uint8)
+
+# All 16 data words and their codewords, used as lookup tables
+DATA_WORDS = ((np.arange(16)[:, None] >> np.arange(3, -1, -1)) & 1).astype(np.uint8)
+CODEWORDS = (DATA_WORDS @ HAMMING_G % 2).astype(np.uint8)
+# Codewords as +1/-1, for soft-decision (correlation) decoding
+CODEWORDS_BIPOLAR = CODEWORDS.astype(np.float64) * 2 - 1
+
+SCHEMES = ('repetition', 'hamming')
+
+
+def interleaver(length, seed=0x5EED):
+    """Fixed pseudo-random permutation that spreads burst errors over the whole block."""
+    return np.random.default_rng(seed).permutation(length)
+
+
+def coded_length(num_bits, scheme='hamming', repetitions=3):
+    """Number of embedded bits needed to carry num_bits data bits."""
+    if scheme not in SCHEMES:
+        raise ValueError(f"Unknown FEC scheme '{scheme}'. Use one of: {', '.join(SCHEMES)}")
+    if scheme == 'hamming':
+        num_bits = -(-num_bits // 4) * 7
+    return num_bits * repetitions
+
+
+def max_payload_bytes(num_bits, fec=None, repetitions=3):
+    """
+    Largest payload (in bytes) that fits in num_bits embedded bits together
+    with its header, coded the way protect_payload codes it.
+    """
+    if fec is None:
+        return max(0, (num_bits - HEADER_BITS) // 8)
+    # Hamming codes a byte as exactly two 7-bit codewords, so the cost per byte is fixed
+    remaining = num_bits - coded_length(HEADER_BITS, fec, repetitions)
+    return max(0, remaining // coded_length(8, fec, repetitions))
+
+
+def encode_fec(bits, scheme='hamming', repetitions=3):
+    """
+    Protects a 0/1 bit array: optional Hamming(7,4) code, then every coded bit
+    is repeated, then the block is interleaved.
+    """
+    coded = np.asarray(bits, dtype=np.uint8)
+    if scheme == 'hamming':
+        padding = -len(coded) % 4
+        coded = np.concatenate([coded, np.zeros(padding, dtype=np.uint8)])
+        # table lookup: 4 data bits -> index into CODEWORDS
+        words = coded.reshape(-1, 4) @ np.array([8, 4, 2, 1])
+        coded = CODEWORDS[words].ravel()
+
+    # copies of a bit are one block length apart
+    repeated = np.tile(coded, repetitions)
+    order = interleaver(len(repeated))
+    interleaved = np.empty_like(repeated)
+    interleaved[order] = repeated
+    return interleaved
+
+
+def decode_fec(soft_bits, num_bits, scheme='hamming', repetitions=3):
+    """
+    Recovers num_bits data bits from soft values, one per embedded bit.
+
+    A soft value's sign is the bit decision (positive = 1) and its magnitude
+    the confidence, e.g. the distance to the decision boundary. Repeated copies
+    are summed, and each Hamming block is decoded to the codeword with the
+    highest correlation (maximum likelihood), which corrects more errors than
+    hard syndrome decoding.
+    """
+    total = coded_length(num_bits, scheme, repetitions)
+    soft_bits = np.asarray(soft_bits, dtype=np.float64)
+    if len(soft_bits) < total:
+        raise ValueError(f"Not enough bits for FEC decoding. Expected {total}, found {len(soft_bits)}.")
+
+    order = interleaver(total)
+    repeated = soft_bits[:total][order]
+    combined = repeated.reshape(repetitions, -1).sum(axis=0)
+
+    if scheme == 'hamming':
+        scores = combined.reshape(-1, 7) @ CODEWORDS_BIPOLAR.T
+        bits = DATA_WORDS[np.argmax(scores, axis=1)].ravel()
+    else:
+        bits = (combined > 0).astype(np.uint8)
+    return bits[:num_bits]
+
+
+def hard_to_soft(bits):
+    """Maps 0/1 decisions to -1/+1 soft values with equal confidence."""
+    return np.asarray(bits, dtype=np.float64) * 2 - 1
+
+
+def protect_payload(method, payload, fec=None, repetitions=3):
+    """
+    Returns the bits to embed for a payload: the stego header followed by the
+    payload. With fec set, header and payload are coded as two separate
+    blocks, so the decoder can recover the header (and so the payload length)
+    before it knows how long the payload block is.
+    """
+    if fec is None:
+        return frame_payload(method, payload)
+    header_bits = encode_fec(bytes_to_bits(build_header(method, payload)), fec, repetitions)
+    payload_bits = encode_fec(bytes_to_bits(payload), fec, repetitions)
+    return np.concatenate([header_bits, payload_bits])
+
+
+def recover_payload(soft_bits, method, fec=None, repetitions=3):
+    """
+    Inverse of protect_payload. soft_bits holds one soft value per extracted
+    bit (see decode_fec). Raises ValueError if there is no valid header or the
+    payload fails its CRC check.
+    """
+    soft_bits = np.asarray(soft_bits, dtype=np.float64)
+    if fec is None:
+        bits = (soft_bits > 0).astype(np.uint8)
+        header = parse_header(bits, method)
+        total_bits = HEADER_BITS + header['length'] * 8
+        if len(bits) < total_bits:
+            raise ValueError(f"File appears corrupted. Extracted {len(bits)} bits, expected {total_bits}.")
+        payload = bits_to_bytes(bits[HEADER_BITS:total_bits])
+    else:
+        header_length = coded_length(HEADER_BITS, fec, repetitions)
+        header = parse_header(decode_fec(soft_bits, HEADER_BITS, fec, repetitions), method)
+        payload_bits = decode_fec(soft_bits[header_length:], header['length'] * 8, fec, repetitions)
+        payload = bits_to_bytes(payload_bits)
+
+    verify_payload(header, payload)
+    return header, payload
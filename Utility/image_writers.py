@@ -0,0 +1,135 @@
+from PIL import Image
+import numpy as np
+import os
+import time
+
+
+# Extension -> writer name, used when no writer is given explicitly
+EXTENSION_WRITERS = {
+    '.png': 'png',
+    '.webp': 'webp',
+    '.tif': 'tiff',
+    '.tiff': 'tiff',
+    '.bmp': 'bmp',
+    '.npy': 'npy',
+}
+
+
+def _as_uint8(data):
+    # No copy if the embedded array is already uint8 and contiguous
+    return np.ascontiguousarray(data, dtype=np.uint8)
+
+
+def write_png(data, output_path, compress_level=6):
+    """PNG, compress_level 0 (store only, fastest) to 9 (smallest)."""
+    Image.fromarray(_as_uint8(data)).save(output_path, format='PNG',
+                                          compress_level=compress_level)
+
+
+def write_webp(data, output_path, method=4, quality=100):
+    """Lossless WebP. For lossless, quality is the compression effort (0-100)."""
+    Image.fromarray(_as_uint8(data)).save(output_path, format='WEBP', lossless=True,
+                                          exact=True, method=method, quality=quality)
+
+
+def write_tiff(data, output_path):
+    """Uncompressed TIFF."""
+    Image.fromarray(_as_uint8(data)).save(output_path, format='TIFF', compression=None)
+
+
+def write_bmp(data, output_path):
+    """Uncompressed BMP."""
+    Image.fromarray(_as_uint8(data)).save(output_path, format='BMP')
+
+
+def write_npy(data, output_path):
+    """Raw NumPy array, for intermediate pipeline steps. Written straight from the array buffer."""
+    np.save(output_path, _as_uint8(data))
+
+
+WRITERS = {
+    'png': write_png,
+    'webp': write_webp,
+    'tiff': write_tiff,
+    'bmp': write_bmp,
+    'npy': write_npy,
+}
+
+
+def save_stego_image(data, output_path, writer=None, **options):
+    """
+    Saves an embedded (height, width, channels) uint8 array losslessly.
+    The writer is picked from the file extension unless given by name;
+    options are passed to it (e.g. compress_level for 'png').
+    """
+    if writer is None:
+        extension = os.path.splitext(output_path)[1].lower()
+        if extension not in EXTENSION_WRITERS:
+            raise ValueError(f"No lossless writer for '{extension}' files. "
+                             f"Use one of: {', '.join(EXTENSION_WRITERS)}")
+        writer = EXTENSION_WRITERS[extension]
+    if writer not in WRITERS:
+        raise ValueError(f"Unknown writer '{writer}'. Use one of: {', '.join(WRITERS)}")
+
+    WRITERS[writer](data, output_path, **options)
+
+
+def load_stego_image(path):
+    """Loads a stego image written by save_stego_image as an RGB uint8 array."""
+    if path.lower().endswith('.npy'):
+        return np.load(path, mmap_mode='r')
+    with Image.open(path) as img:
+        return np.asarray(img.convert('RGB'))
+
+
+BENCHMARK_SETTINGS = [
+    ('png', {'compress_level': 0}),
+    ('png', {'compress_level': 1}),
+    ('png', {'compress_level': 6}),
+    ('png', {'compress_level': 9}),
+    ('webp', {'method': 0}),
+    ('webp', {'method': 4}),
+    ('tiff', {}),
+    ('bmp', {}),
+    ('npy', {}),
+]
+
+
+def benchmark_writers(data, output_dir, repeats=3):
+    """
+    Writes data with every writer setting and reports the best write time
+    and the resulting file size. Also checks that every output reads back
+    bit-exact.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    extensions = {'png': '.png', 'webp': '.webp', 'tiff': '.tif', 'bmp': '.bmp', 'npy': '.npy'}
+    results = []
+
+    for writer, options in BENCHMARK_SETTINGS:
+        label = writer + ''.join(f"_{key}{value}" for key, value in options.items())
+        output_path = os.path.join(output_dir, label + extensions[writer])
+
+        best = float('inf')
+        for _ in range(repeats):
+            start = time.perf_counter()
+            save_stego_image(data, output_path, writer, **options)
+            best = min(best, time.perf_counter() - start)
+
+        lossless = np.array_equal(load_stego_image(output_path), data)
+        size_kb = os.path.getsize(output_path) / 1024
+        results.append((label, best, size_kb, lossless))
+        print(f"{label:<22} {best * 1000:9.1f} ms  {size_kb:10.1f} KB  "
+              f"{'lossless' if lossless else 'NOT LOSSLESS'}")
+
+    return results
+
+
+if __name__ == "__main__":
+    stego_image_path = "stego_with_image.png"
+
+    try:
+        with Image.open(stego_image_path) as img:
+            stego_data = np.asarray(img.convert('RGB'))
+        benchmark_writers(stego_data, "writer_benchmark")
+    except FileNotFoundError:
+        print(f"Error: Make sure '{stego_image_path}' exists.")
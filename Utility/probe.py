@@ -0,0 +1,145 @@
+from PIL import Image
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+import os
+
+from stego_header import HEADER_BITS, parse_header, extract_lsb
+from compare_audio import read_wav
+from embedders import get_embedder
+from strip_io import image_layouts, iter_pages
+from tiled_lsb import tiled_method
+
+
+AUDIO_EXTENSIONS = ('.wav',)
+IMAGE_EXTENSIONS = ('.png', '.bmp', '.tif', '.tiff', '.webp', '.npy')
+
+
+def soft_header_bits(method, samples):
+    """
+    Reads the header bits of a DCT or phase coded signal (embedded with the
+    default settings and no FEC) from the first samples that hold them.
+    """
+    embedder = get_embedder(method)
+    soft_bits = embedder.soft_bits(samples[:embedder.samples_needed(HEADER_BITS)])
+    return (soft_bits[:HEADER_BITS] > 0).astype(np.uint8)
+
+
+def try_header(bits, methods):
+    """Returns the parsed header if bits hold one written by any of the given methods."""
+    try:
+        header = parse_header(bits)
+    except ValueError:
+        return None
+    return header if header['method'] in methods else None
+
+
+def probe_audio(path):
+    """
+    Looks for a stego header in a WAV file. The file is memory-mapped and only
+    the samples that can hold a header are touched.
+    """
+    _, data = read_wav(path)
+    flat = data.reshape(-1)
+    first_channel = data[:, 0] if data.ndim > 1 else data
+
+    candidates = [
+        (('audio_lsb',), lambda: extract_lsb(flat, HEADER_BITS)),
+        (('audio_lsb_2bit', 'audio_lsb_2bit_shard'),
+         lambda: extract_lsb(flat, HEADER_BITS, bits_per_sample=2)),
+        (('audio_dct',), lambda: soft_header_bits('audio_dct', first_channel)),
+        (('audio_phase',), lambda: soft_header_bits('audio_phase', first_channel)),
+    ]
+    for methods, header_bits in candidates:
+        header = try_header(header_bits(), methods)
+        if header:
+            return header
+
+    # Tuned (version 2) headers, written with autotune's bootstrap settings.
+    # autotune is only imported when a file gets this far, which keeps image
+    # probes and plain audio probes free of it
+    from autotune import read_tuned_header
+    for method in ('audio_dct', 'audio_phase'):
+        try:
+            return read_tuned_header(first_channel, method)[0]
+        except ValueError:
+            pass
+    return None
+
+
+def native_prefix(path, num_values):
+    """
+    First num_values values of an image in its own mode (L, RGBA, 16-bit...)
+    and page order, as tiled_lsb embeds them. Only the first strips are decoded.
+    """
+    values, count = [], 0
+    for _, bands in iter_pages(path, strip_rows=8):
+        for band in bands:
+            values.append(band.reshape(-1)[:num_values - count])
+            count += len(values[-1])
+            if count >= num_values:
+                return np.concatenate(values)
+    return np.concatenate(values) if values else np.zeros(0, dtype=np.uint8)
+
+
+def probe_image(path):
+    """
+    Looks for an LSB stego header in an image, decoding as little of it as
+    possible. A single 8-bit RGB page is read strip by strip; other images are
+    read as RGB first (LSBEmbedder and shards), then in their own mode
+    (tiled_lsb output).
+    """
+    if path.lower().endswith('.npy'):
+        values = np.load(path, mmap_mode='r').reshape(-1)[:HEADER_BITS]
+        return try_header(extract_lsb(values, HEADER_BITS), ('image_lsb', 'image_lsb_shard'))
+
+    if tiled_method(image_layouts(path)) == 'image_lsb':
+        # Its own values are its RGB values, so one read covers both
+        values = native_prefix(path, HEADER_BITS)
+        return try_header(extract_lsb(values, HEADER_BITS), ('image_lsb', 'image_lsb_shard'))
+
+    with Image.open(path) as img:
+        values = np.asarray(img.convert('RGB')).reshape(-1)[:HEADER_BITS]
+    header = try_header(extract_lsb(values, HEADER_BITS), ('image_lsb', 'image_lsb_shard'))
+    if header is None:
+        header = try_header(extract_lsb(native_prefix(path, HEADER_BITS), HEADER_BITS),
+                            ('image_lsb_tiled',))
+    return header
+
+
+def probe_file(path):
+    """
+    Classifies a single file. Returns the parsed header dict (method, version,
+    length, crc32) if it carries a payload, otherwise None.
+    The CRC is not checked here, since that needs the whole payload.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    try:
+        if extension in AUDIO_EXTENSIONS:
+            return probe_audio(path)
+        if extension in IMAGE_EXTENSIONS:
+            return probe_image(path)
+    except (OSError, ValueError) as e:
+        print(f"Warning: could not read {path}: {e}")
+    return None
+
+
+def scan_directory(root, workers=None):
+    """Probes every audio and image file under root in a process pool."""
+    paths = [os.path.join(folder, name)
+             for folder, _, names in os.walk(root) for name in names
+             if name.lower().endswith(AUDIO_EXTENSIONS + IMAGE_EXTENSIONS)]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(probe_file, paths, chunksize=64)
+        return [(path, header) for path, header in zip(paths, results)]
+
+
+if __name__ == "__main__":
+    scan_root = "."
+
+    found = 0
+    for path, header in scan_directory(scan_root):
+        if header:
+            found += 1
+            print(f"{path}: {header['method']} payload, {header['length']} bytes")
+    print(f"\n--- Scan complete: {found} file(s) with embedded payloads ---")
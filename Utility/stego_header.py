@@ -0,0 +1,146 @@
+import numpy as np
+import struct
+import zlib
+
+
+# Header layout (big-endian), written in front of every payload:
+#   magic (3 bytes) | version (1) | method id (1) | payload length in bytes (4) | CRC32 of payload (4)
+MAGIC = b'STG'
+VERSION = 1
+HEADER_FORMAT = '>3sBBII'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+HEADER_BITS = HEADER_SIZE * 8
+
+# Version 2 headers are followed by the embedding parameters that the payload
+# was written with (see Utility/autotune.py), so decoding needs no settings:
+#   frame size (2 bytes) | first index (2) | second index (2) | step (4, float)
+#   | FEC scheme (1) | FEC repetitions (1)
+VERSION_TUNED = 2
+PARAMS_FORMAT = '>HHHfBB'
+PARAMS_SIZE = struct.calcsize(PARAMS_FORMAT)
+TUNED_HEADER_BITS = HEADER_BITS + PARAMS_SIZE * 8
+FEC_IDS = {None: 0, 'repetition': 1, 'hamming': 2}
+FEC_NAMES = {fec_id: name for name, fec_id in FEC_IDS.items()}
+
+METHOD_IDS = {
+    'image_lsb': 1,
+    'audio_lsb': 2,
+    'audio_lsb_2bit': 3,
+    'audio_dct': 4,
+    'audio_phase': 5,
+    'image_lsb_shard': 6,
+    'audio_lsb_2bit_shard': 7,
+    'audio_dsss': 8,
+    # tiled_lsb output in the carrier's own mode (anything but one 8-bit RGB page)
+    'image_lsb_tiled': 9,
+}
+METHOD_NAMES = {method_id: name for name, method_id in METHOD_IDS.items()}
+
+
+def bytes_to_bits(data):
+    """Returns the bits of a bytes object as a uint8 array (MSB first)."""
+    return np.unpackbits(np.frombuffer(data, dtype=np.uint8))
+
+
+def bits_to_bytes(bits):
+    """Packs a 0/1 array (MSB first) back into bytes. Trailing partial bytes are dropped."""
+    bits = np.asarray(bits, dtype=np.uint8)
+    return np.packbits(bits[:len(bits) // 8 * 8]).tobytes()
+
+
+def build_header(method, payload, version=VERSION):
+    """Returns the header bytes for a payload hidden with the given method."""
+    return struct.pack(HEADER_FORMAT, MAGIC, version, METHOD_IDS[method],
+                       len(payload), zlib.crc32(payload))
+
+
+def build_tuned_header(method, payload, params):
+    """
+    Returns a version 2 header followed by the parameter block. params is a
+    dict with frame_size, first, second, step, fec and repetitions.
+    """
+    block = struct.pack(PARAMS_FORMAT, params['frame_size'], params['first'], params['second'],
+                        params['step'], FEC_IDS[params['fec']], params['repetitions'])
+    return build_header(method, payload, VERSION_TUNED) + block
+
+
+def frame_payload(method, payload):
+    """Returns header + payload as a bit array ready to be embedded."""
+    return bytes_to_bits(build_header(method, payload) + payload)
+
+
+def parse_header(header_bits, method=None, versions=(VERSION,)):
+    """
+    Decodes the first HEADER_BITS bits of an extracted bit stream.
+    Raises ValueError if there is no valid header, if its version is not in
+    versions, or if it was written by a different method than the expected one.
+    """
+    if len(header_bits) < HEADER_BITS:
+        raise ValueError("File is too small to contain a stego header.")
+
+    magic, version, method_id, length, crc = struct.unpack(
+        HEADER_FORMAT, bits_to_bytes(header_bits[:HEADER_BITS]))
+
+    if magic != MAGIC:
+        raise ValueError("No stego header found (bad magic bytes).")
+    if version not in versions:
+        raise ValueError(f"Unsupported stego header version {version}.")
+    if method_id not in METHOD_NAMES:
+        raise ValueError(f"Unknown embedding method id {method_id}.")
+    if method is not None and METHOD_NAMES[method_id] != method:
+        raise ValueError(f"Payload was embedded with '{METHOD_NAMES[method_id]}', "
+                         f"not '{method}'.")
+
+    return {'version': version, 'method': METHOD_NAMES[method_id],
+            'length': length, 'crc32': crc}
+
+
+def parse_tuned_header(header_bits, method=None):
+    """Decodes a version 2 header and its parameter block; returns (header, params)."""
+    if len(header_bits) < TUNED_HEADER_BITS:
+        raise ValueError("File is too small to contain a tuned stego header.")
+    header = parse_header(header_bits, method, versions=(VERSION_TUNED,))
+
+    frame_size, first, second, step, fec_id, repetitions = struct.unpack(
+        PARAMS_FORMAT, bits_to_bytes(header_bits[HEADER_BITS:TUNED_HEADER_BITS]))
+    if fec_id not in FEC_NAMES or frame_size == 0 or repetitions == 0:
+        raise ValueError("Invalid parameter block in tuned stego header.")
+    params = {'frame_size': frame_size, 'first': first, 'second': second, 'step': step,
+              'fec': FEC_NAMES[fec_id], 'repetitions': repetitions}
+    return header, params
+
+
+def verify_payload(header, payload):
+    """Raises ValueError if the payload does not match the length and CRC32 in the header."""
+    if len(payload) != header['length']:
+        raise ValueError(f"Payload is truncated. Expected {header['length']} bytes, "
+                         f"got {len(payload)}.")
+    if zlib.crc32(payload) != header['crc32']:
+        raise ValueError("Payload checksum mismatch. Data is corrupted.")
+
+
+def embed_lsb(flat_carrier, bits, bits_per_sample=1):
+    """Writes bits into the lowest bits_per_sample bits of flat_carrier, in place."""
+    bits = np.asarray(bits, dtype=np.uint8)
+    padding = -len(bits) % bits_per_sample
+    if padding:
+        bits = np.concatenate([bits, np.zeros(padding, dtype=np.uint8)])
+
+    if bits_per_sample == 1:
+        values = bits.astype(flat_carrier.dtype)
+    else:
+        weights = 1 << np.arange(bits_per_sample - 1, -1, -1)
+        values = (bits.reshape(-1, bits_per_sample) @ weights).astype(flat_carrier.dtype)
+    keep_mask = np.array(~((1 << bits_per_sample) - 1)).astype(flat_carrier.dtype)
+
+    n = len(values)
+    flat_carrier[:n] = (flat_carrier[:n] & keep_mask) | values
+
+
+def extract_lsb(flat_data, num_bits, bits_per_sample=1):
+    """Reads num_bits bits back from the lowest bits_per_sample bits of flat_data."""
+    num_samples = -(-num_bits // bits_per_sample)
+    values = np.asarray(flat_data[:num_samples])
+    shifts = np.arange(bits_per_sample - 1, -1, -1)
+    bits = ((values[:, None] >> shifts) & 1).astype(np.uint8).ravel()
+    return bits[:num_bits]
@@ -0,0 +1,413 @@
+import numpy as np
+from scipy.signal import fftconvolve
+import argparse
+import struct
+import sys
+import time
+
+from stego_header import (MAGIC, VERSION, METHOD_IDS, HEADER_BITS, frame_payload, parse_header,
+                          verify_payload, bytes_to_bits, bits_to_bytes, embed_lsb, extract_lsb)
+from embedders import dct_basis, embed_dct_frames
+
+
+# Streams are raw interleaved 16-bit little-endian PCM
+SAMPLE_DTYPE = np.dtype('<i2')
+
+
+def as_samples(block):
+    """Returns a PCM block (int16 array or raw bytes) as a flat int16 array."""
+    if isinstance(block, np.ndarray):
+        return block.reshape(-1).astype(SAMPLE_DTYPE, copy=False)
+    return np.frombuffer(block, dtype=SAMPLE_DTYPE)
+
+
+class BitSource:
+    """
+    Hands out the framed payload bits (header + payload) in order. With
+    repeat=True the payload is sent again and again, so a decoder that joins
+    the stream late still finds a complete copy.
+    """
+
+    def __init__(self, method, payload, repeat=True):
+        self.bits = frame_payload(method, payload)
+        self.repeat = repeat
+        self.position = 0
+
+    def next_bits(self, count):
+        """Returns up to count bits (fewer once a non-repeating payload is used up)."""
+        if self.repeat:
+            indices = (self.position + np.arange(count)) % len(self.bits)
+            self.position = (self.position + count) % len(self.bits)
+            return self.bits[indices]
+        bits = self.bits[self.position:self.position + count]
+        self.position += len(bits)
+        return bits
+
+
+class LSBStreamEmbedder:
+    """
+    Embeds into the lowest bits_per_sample bits of every incoming sample.
+    Each block is returned as soon as it is processed, so there is no added latency.
+    """
+
+    def __init__(self, payload, bits_per_sample=1, repeat=True):
+        self.method = 'audio_lsb' if bits_per_sample == 1 else 'audio_lsb_2bit'
+        self.bits_per_sample = bits_per_sample
+        self.source = BitSource(self.method, payload, repeat)
+        self.latency_samples = 0
+
+    def process(self, block):
+        samples = as_samples(block).copy()
+        bits = self.source.next_bits(len(samples) * self.bits_per_sample)
+        if len(bits):
+            embed_lsb(samples, bits, self.bits_per_sample)
+        return samples
+
+    def flush(self):
+        return np.zeros(0, dtype=SAMPLE_DTYPE)
+
+
+class DCTStreamEmbedder:
+    """
+    Embeds one bit per frame of the first channel, like DCTEmbedder. Incoming
+    samples are held until a frame is complete, so the latency is at most
+    one frame (frame_size samples per channel).
+    """
+
+    def __init__(self, payload, channels=1, frame_size=1024, coeff_index=430,
+                 quantization_step=80.0, repeat=True):
+        self.method = 'audio_dct'
+        self.channels = channels
+        self.frame_size = frame_size
+        self.quantization_step = quantization_step
+        self.basis = dct_basis(frame_size, coeff_index)
+        self.source = BitSource(self.method, payload, repeat)
+        self.pending = np.zeros(0, dtype=SAMPLE_DTYPE)
+        self.latency_samples = frame_size
+
+    def process(self, block):
+        self.pending = np.concatenate([self.pending, as_samples(block)])
+        frame_samples = self.frame_size * self.channels
+        num_frames = len(self.pending) // frame_samples
+        ready = self.pending[:num_frames * frame_samples].copy()
+        self.pending = self.pending[num_frames * frame_samples:]
+
+        bits = self.source.next_bits(num_frames)
+        if len(bits):
+            used = len(bits) * frame_samples
+            first = ready[:used].reshape(-1, self.channels)[:, 0].astype(float)
+            frames = first.reshape(len(bits), self.frame_size)
+            embed_dct_frames(frames, bits, self.basis, self.quantization_step)
+            ready[:used].reshape(-1, self.channels)[:, 0] = np.clip(np.round(first), -32768, 32767)
+        return ready
+
+    def flush(self):
+        """Returns the samples of the last, incomplete frame unchanged."""
+        tail, self.pending = self.pending, np.zeros(0, dtype=SAMPLE_DTYPE)
+        return tail
+
+
+class PayloadScanner:
+    """
+    Finds complete payloads in a stream of extracted bits that may start
+    anywhere. It looks for the fixed start of the header (magic, version,
+    method id), checks the rest of the header, waits until the payload bits
+    have arrived and accepts the payload only if its CRC32 matches. Bits that
+    can no longer start a payload are dropped, so memory stays bounded by
+    one header plus max_length bytes.
+    """
+
+    def __init__(self, method, max_length=1 << 20):
+        self.method = method
+        self.max_length = max_length
+        self.pattern = bytes_to_bits(struct.pack('>3sBB', MAGIC, VERSION, METHOD_IDS[method]))
+        self.bits = np.zeros(0, dtype=np.uint8)
+        self.scan_from = 0
+
+    def process(self, new_bits):
+        """Adds extracted bits and returns the list of payloads completed by them."""
+        self.bits = np.concatenate([self.bits, np.asarray(new_bits, dtype=np.uint8)])
+        found = []
+        waiting = False
+        for start in self.find_patterns():
+            if start < self.scan_from:
+                continue
+            if start + HEADER_BITS > len(self.bits):
+                waiting = True
+                break
+            try:
+                header = parse_header(self.bits[start:start + HEADER_BITS], self.method)
+            except ValueError:
+                continue
+            if header['length'] > self.max_length:
+                continue
+
+            end = start + HEADER_BITS + header['length'] * 8
+            if end > len(self.bits):
+                waiting = True
+                break
+            payload = bits_to_bytes(self.bits[start + HEADER_BITS:end])
+            try:
+                verify_payload(header, payload)
+            except ValueError:
+                continue
+            found.append(payload)
+            self.scan_from = end
+
+        if waiting:
+            # a header whose payload has not fully arrived yet
+            self.scan_from = start
+        else:
+            # keep just enough bits to match a pattern split across blocks
+            self.scan_from = max(self.scan_from, len(self.bits) - len(self.pattern) + 1)
+        self.bits = self.bits[self.scan_from:]
+        self.scan_from = 0
+        return found
+
+    def find_patterns(self):
+        """
+        Positions at or after scan_from where the header pattern starts.
+        Candidates are narrowed one pattern bit at a time, so the cost is
+        about two comparisons per bit instead of one per pattern bit.
+        """
+        positions = np.arange(self.scan_from, len(self.bits) - len(self.pattern) + 1)
+        for offset, bit in enumerate(self.pattern):
+            if len(positions) == 0:
+                break
+            positions = positions[self.bits[positions + offset] == bit]
+        return positions
+
+
+class LSBStreamDecoder:
+    """Recovers LSB payloads from a PCM stream joined at any point."""
+
+    def __init__(self, bits_per_sample=1, max_length=1 << 20):
+        self.bits_per_sample = bits_per_sample
+        method = 'audio_lsb' if bits_per_sample == 1 else 'audio_lsb_2bit'
+        self.scanner = PayloadScanner(method, max_length)
+
+    def process(self, block):
+        samples = as_samples(block)
+        return self.scanner.process(extract_lsb(samples, len(samples) * self.bits_per_sample,
+                                                self.bits_per_sample))
+
+
+class DCTStreamDecoder:
+    """
+    Recovers DCT payloads from a stream joined at any point. The frame
+    boundaries are unknown at first, so the decoder buffers sync_frames frames
+    and computes the coefficient at every sample offset with one FFT
+    convolution. Embedded frames have their coefficient right on a
+    quantization level, so the offset with the highest mean confidence is the
+    frame grid. If the confidence falls below min_confidence (samples dropped,
+    payload over), the decoder searches again.
+    """
+
+    def __init__(self, channels=1, frame_size=1024, coeff_index=430, quantization_step=80.0,
+                 sync_frames=16, min_confidence=0.8, max_length=1 << 20):
+        self.channels = channels
+        self.frame_size = frame_size
+        self.quantization_step = quantization_step
+        self.basis = dct_basis(frame_size, coeff_index)
+        self.sync_frames = sync_frames
+        self.min_confidence = min_confidence
+        self.scanner = PayloadScanner('audio_dct', max_length)
+        self.samples = np.zeros(0)         # first channel, not yet turned into bits
+        self.leftover = np.zeros(0, dtype=SAMPLE_DTYPE)  # partial multi-channel sample
+        self.locked = False
+        self.recent_confidence = []
+
+    def confidence(self, coeffs):
+        scaled = coeffs / self.quantization_step
+        return 1 - 2 * np.abs(scaled - np.round(scaled))
+
+    def synchronize(self):
+        """Finds the frame offset in the buffered samples; returns True once locked."""
+        if len(self.samples) < (self.sync_frames + 1) * self.frame_size:
+            return False
+        # coefficient of the frame starting at every sample
+        coeffs = fftconvolve(self.samples, self.basis[::-1], mode='valid')
+        usable = self.sync_frames * self.frame_size
+        per_offset = self.confidence(coeffs[:usable]).reshape(self.sync_frames, self.frame_size)
+        scores = per_offset.mean(axis=0)
+        offset = int(np.argmax(scores))
+        if scores[offset] < self.min_confidence:
+            # no frame grid here; keep the last frame's worth of samples and try later
+            self.samples = self.samples[-self.frame_size:]
+            return False
+        self.samples = self.samples[offset:]
+        self.locked = True
+        self.recent_confidence = []
+        return True
+
+    def process(self, block):
+        """Adds a PCM block and returns the list of payloads completed by it."""
+        samples = np.concatenate([self.leftover, as_samples(block)])
+        whole = len(samples) // self.channels * self.channels
+        self.leftover = samples[whole:]
+        self.samples = np.concatenate([self.samples, samples[:whole:self.channels].astype(float)])
+
+        if not self.locked and not self.synchronize():
+            return []
+
+        num_frames = len(self.samples) // self.frame_size
+        frames = self.samples[:num_frames * self.frame_size].reshape(num_frames, self.frame_size)
+        self.samples = self.samples[num_frames * self.frame_size:]
+        coeffs = frames @ self.basis
+        levels = np.round(coeffs / self.quantization_step)
+
+        self.recent_confidence = (self.recent_confidence +
+                                  list(self.confidence(coeffs)))[-self.sync_frames:]
+        found = self.scanner.process((levels % 2).astype(np.uint8))
+        if (len(self.recent_confidence) == self.sync_frames
+                and np.mean(self.recent_confidence) < self.min_confidence):
+            self.locked = False
+        return found
+
+
+def embed_stream(blocks, embedder):
+    """Generator: yields the stego PCM for an iterable of PCM blocks."""
+    for block in blocks:
+        output = embedder.process(block)
+        if len(output):
+            yield output
+    tail = embedder.flush()
+    if len(tail):
+        yield tail
+
+
+def decode_stream(blocks, decoder):
+    """Generator: yields every payload found in an iterable of PCM blocks."""
+    for block in blocks:
+        yield from decoder.process(block)
+
+
+def read_blocks(stream, block_samples, channels=1):
+    """Reads raw 16-bit PCM from a binary stream in blocks of block_samples samples per channel."""
+    frame_bytes = channels * SAMPLE_DTYPE.itemsize
+    block_bytes = block_samples * frame_bytes
+    remainder = b''
+    while True:
+        data = stream.read(block_bytes)
+        if not data:
+            break
+        # a short read can end in the middle of a sample (or of a frame of all
+        # channels); the partial frame is carried over and completed by the next read
+        data = remainder + data
+        usable = len(data) // frame_bytes * frame_bytes
+        remainder = data[usable:]
+        if usable:
+            yield data[:usable]
+
+
+def make_embedder(method, payload, channels=1, repeat=True):
+    if method == 'dct':
+        return DCTStreamEmbedder(payload, channels, repeat=repeat)
+    if method in ('lsb', 'lsb2'):
+        return LSBStreamEmbedder(payload, 1 if method == 'lsb' else 2, repeat)
+    raise ValueError(f"Unknown streaming method '{method}'. Use dct, lsb or lsb2.")
+
+
+def make_decoder(method, channels=1):
+    if method == 'dct':
+        return DCTStreamDecoder(channels)
+    if method in ('lsb', 'lsb2'):
+        return LSBStreamDecoder(1 if method == 'lsb' else 2)
+    raise ValueError(f"Unknown streaming method '{method}'. Use dct, lsb or lsb2.")
+
+
+def benchmark(duration=30.0, sample_rate=44100, block_sizes=(64, 256, 1024, 4096), seed=0):
+    """
+    Measures the streaming embedders and decoders on generated noise.
+    For each method and block size it reports the algorithmic latency in ms
+    (samples held back by the embedder), the worst per-block processing time
+    in ms, and throughput as a multiple of real time. The decoders join the
+    stream half a second in, so the result also shows that they lock on.
+    """
+    rng = np.random.default_rng(seed)
+    audio = np.clip(rng.standard_normal(int(duration * sample_rate)) * 3000,
+                    -32768, 32767).astype(SAMPLE_DTYPE)
+    payload = b"live stream watermark"
+    results = []
+
+    for method in ('dct', 'lsb', 'lsb2'):
+        for block_size in block_sizes:
+            embedder = make_embedder(method, payload)
+            blocks = [audio[i:i + block_size] for i in range(0, len(audio), block_size)]
+
+            worst = 0.0
+            outputs = []
+            start = time.perf_counter()
+            for block in blocks:
+                t = time.perf_counter()
+                outputs.append(embedder.process(block))
+                worst = max(worst, time.perf_counter() - t)
+            outputs.append(embedder.flush())
+            embed_time = time.perf_counter() - start
+
+            stego = np.concatenate(outputs)[sample_rate // 2:]
+            decoder = make_decoder(method)
+            start = time.perf_counter()
+            found = list(decode_stream((stego[i:i + block_size]
+                                        for i in range(0, len(stego), block_size)), decoder))
+            decode_time = time.perf_counter() - start
+
+            results.append({
+                'method': method,
+                'block_size': block_size,
+                'latency_ms': 1000 * (embedder.latency_samples + block_size) / sample_rate,
+                'worst_block_ms': 1000 * worst,
+                'embed_realtime': duration / embed_time,
+                'decode_realtime': duration / decode_time,
+                'payloads_found': sum(p == payload for p in found),
+            })
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Embed into or decode from raw 16-bit little-endian PCM on stdin/stdout.")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    embed = sub.add_parser('embed', help="stdin PCM -> stdout stego PCM")
+    embed.add_argument('--payload', required=True, help="file to hide")
+    embed.add_argument('--once', action='store_true', help="send the payload once instead of looping")
+
+    decode = sub.add_parser('decode', help="stdin stego PCM -> payload on stdout")
+    decode.add_argument('--count', type=int, default=1, help="stop after this many payloads")
+
+    for command in (embed, decode):
+        command.add_argument('--method', choices=('dct', 'lsb', 'lsb2'), default='dct')
+        command.add_argument('--channels', type=int, default=1)
+        command.add_argument('--block', type=int, default=256, help="samples per channel per read")
+
+    sub.add_parser('benchmark', help="latency / throughput report")
+    args = parser.parse_args(argv)
+
+    if args.command == 'benchmark':
+        for r in benchmark():
+            print(f"{r['method']:5} block {r['block_size']:5}: latency {r['latency_ms']:6.1f} ms, "
+                  f"worst block {r['worst_block_ms']:6.2f} ms, embed {r['embed_realtime']:7.0f}x, "
+                  f"decode {r['decode_realtime']:7.0f}x real time, "
+                  f"{r['payloads_found']} payloads found")
+        return
+
+    blocks = read_blocks(sys.stdin.buffer, args.block, args.channels)
+    if args.command == 'embed':
+        with open(args.payload, 'rb') as f:
+            embedder = make_embedder(args.method, f.read(), args.channels, not args.once)
+        for output in embed_stream(blocks, embedder):
+            sys.stdout.buffer.write(output.astype(SAMPLE_DTYPE, copy=False).tobytes())
+            sys.stdout.buffer.flush()
+    else:
+        decoder = make_decoder(args.method, args.channels)
+        for count, payload in enumerate(decode_stream(blocks, decoder), start=1):
+            sys.stdout.buffer.write(payload)
+            sys.stdout.buffer.flush()
+            print(f"Payload {count}: {len(payload)} bytes passed its checksum.", file=sys.stderr)
+            if count >= args.count:
+                break
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+from PIL import Image, ImageSequence
+import numpy as np
+import struct
+import zlib
+import io
+import os
+
+# tifffile reads TIFF strips and tiles one at a time. Without it, TIFF files
+# are read through Pillow (one decoded page at a time). Most PNG files are
+# read strip by strip either way.
+try:
+    import tifffile
+except ImportError:
+    tifffile = None
+
+
+# Pillow modes whose values are read as they are: mode -> (dtype, samples, photometric)
+PILLOW_MODES = {
+    'L': (np.uint8, 1, 'minisblack'),
+    'LA': (np.uint8, 2, 'minisblack'),
+    'RGB': (np.uint8, 3, 'rgb'),
+    'RGBA': (np.uint8, 4, 'rgb'),
+    'CMYK': (np.uint8, 4, 'separated'),
+    'I;16': (np.uint16, 1, 'minisblack'),
+    'I;16B': (np.uint16, 1, 'minisblack'),
+}
+
+# Samples per pixel -> PNG colour type (grey, grey + alpha, RGB, RGBA)
+PNG_COLOR_TYPES = {1: 0, 2: 4, 3: 2, 4: 6}
+PNG_SAMPLES = {colour_type: samples for samples, colour_type in PNG_COLOR_TYPES.items()}
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+
+def is_tiff(path):
+    return os.path.splitext(path)[1].lower() in ('.tif', '.tiff')
+
+
+def pillow_mode(frame):
+    """Mode a Pillow page is embedded in. Palette and other modes are converted to RGB(A)."""
+    if frame.mode in PILLOW_MODES:
+        return frame.mode
+    return 'RGBA' if 'A' in frame.getbands() or 'transparency' in frame.info else 'RGB'
+
+
+def pillow_layout(frame):
+    dtype, samples, photometric = PILLOW_MODES[pillow_mode(frame)]
+    width, height = frame.size
+    shape = (height, width) if samples == 1 else (height, width, samples)
+    return {'shape': shape, 'dtype': np.dtype(dtype), 'photometric': photometric,
+            'extrasamples': (2,) if samples in (2, 4) and photometric != 'separated' else (),
+            'subfiletype': 0}
+
+
+def tiff_layout(page):
+    # Photometric names match the ones Pillow layouts use ('rgb', 'minisblack', ...)
+    photometric = tifffile.PHOTOMETRIC(page.photometric).name.lower()
+    return {'shape': page.shape, 'dtype': page.dtype, 'photometric': photometric,
+            'extrasamples': page.extrasamples, 'subfiletype': page.subfiletype}
+
+
+def image_layouts(path):
+    """
+    Returns the layout (shape, dtype, photometric, extra samples) of every
+    page of an image without decoding any pixels.
+    """
+    if tifffile is not None and is_tiff(path):
+        with tifffile.TiffFile(path) as tif:
+            return [tiff_layout(page) for page in tif.pages]
+    with Image.open(path) as img:
+        return [pillow_layout(frame) for frame in ImageSequence.Iterator(img)]
+
+
+def tiff_bands(page):
+    """
+    Yields the rows of a TIFF page one strip (or one row of tiles) at a time,
+    each as an array of shape (rows,) + page.shape[1:].
+    """
+    _, depth, length, width, samples = page.shaped
+    if page.planarconfig != 1 or depth != 1:
+        # Separate planes are stored one after the other, so no row can be
+        # completed before the last plane is read
+        yield page.asarray()
+        return
+
+    # By default tifffile reads up to 256 MB of segments ahead; keep that to a few MB
+    band, band_top = None, 0
+    for segment, (_, _, top, left, _), (_, rows, cols, _) in page.segments(buffersize=1 << 22):
+        if band is None or top != band_top:
+            if band is not None:
+                yield band.reshape((len(band),) + page.shape[1:])
+            band_top = top
+            band = np.zeros((min(rows, length - top), width, samples), dtype=page.dtype)
+        cols = min(cols, width - left)
+        if segment is not None:
+            band[:, left:left + cols] = segment[0, :len(band), :cols]
+    if band is not None:
+        yield band.reshape((len(band),) + page.shape[1:])
+
+
+def pillow_bands(frame, strip_rows):
+    """Yields a Pillow page strip_rows rows at a time, in the mode chosen by pillow_mode."""
+    mode = pillow_mode(frame)
+    dtype = PILLOW_MODES[mode][0]
+    width, height = frame.size
+    for top in range(0, height, strip_rows):
+        strip = frame.crop((0, top, width, min(top + strip_rows, height)))
+        if strip.mode != mode:
+            strip = strip.convert(mode)
+        yield np.asarray(strip).astype(dtype, copy=False)
+
+
+def png_header(path):
+    """Returns the IHDR fields (width, height, bit depth, colour type, interlace) of a PNG file."""
+    with open(path, 'rb') as f:
+        head = f.read(33)
+    if head[:8] != PNG_SIGNATURE or head[12:16] != b'IHDR':
+        raise ValueError(f"{path} is not a PNG file.")
+    width, height, depth, colour_type, _, _, interlace = struct.unpack('>IIBBBBB', head[16:29])
+    return width, height, depth, colour_type, interlace
+
+
+def is_streamable_png(path):
+    """True for non-interlaced 8-bit grey/GA/RGB/RGBA and 16-bit grey PNGs, which png_bands reads."""
+    if os.path.splitext(path)[1].lower() != '.png':
+        return False
+    _, _, depth, colour_type, interlace = png_header(path)
+    return interlace == 0 and colour_type in PNG_SAMPLES and \
+        (depth == 8 or (depth == 16 and colour_type == 0))
+
+
+def png_idat(f, piece_size=1 << 20):
+    """Yields the compressed image data of a PNG file in pieces of at most piece_size bytes."""
+    f.seek(len(PNG_SIGNATURE))
+    while True:
+        length, kind = struct.unpack('>I4s', f.read(8))
+        if kind == b'IEND':
+            return
+        if kind != b'IDAT':
+            f.seek(length + 4, os.SEEK_CUR)
+            continue
+        while length:
+            piece = f.read(min(length, piece_size))
+            length -= len(piece)
+            yield piece
+        f.seek(4, os.SEEK_CUR)
+
+
+def png_bands(path, strip_rows):
+    """
+    Yields the rows of a PNG file strip_rows rows at a time, without decoding
+    the whole image. The image data is decompressed incrementally; each strip
+    of filtered rows is unfiltered by Pillow as a small PNG whose first row is
+    the previous (already unfiltered) row, so Up/Average/Paeth filters see
+    the right neighbours.
+    """
+    width, height, depth, colour_type, _ = png_header(path)
+    samples = PNG_SAMPLES[colour_type]
+    pixel_bytes = samples * depth // 8
+    row_bytes = width * pixel_bytes
+    # 8-bit colour type with the same bytes per pixel; filters work on bytes
+    carrier_type = PNG_COLOR_TYPES[pixel_bytes]
+    dtype = np.dtype('>u2') if depth == 16 else np.dtype(np.uint8)
+    shape = (width,) if samples == 1 else (width, samples)
+
+    decompressor = zlib.decompressobj()
+    previous = bytes(row_bytes + 1)
+    pending = bytearray()
+    top = 0
+    with open(path, 'rb') as f:
+        pieces = png_idat(f)
+        while top < height:
+            rows = min(strip_rows, height - top)
+            needed = rows * (row_bytes + 1)
+            while len(pending) < needed:
+                data = decompressor.unconsumed_tail or next(pieces, b'')
+                if not data:
+                    raise ValueError(f"{path} is truncated.")
+                pending += decompressor.decompress(data, needed - len(pending))
+
+            strip_png = io.BytesIO()
+            strip_png.write(PNG_SIGNATURE)
+            write_png_chunk(strip_png, b'IHDR', struct.pack('>IIBBBBB', width, rows + 1, 8,
+                                                            carrier_type, 0, 0, 0))
+            write_png_chunk(strip_png, b'IDAT', zlib.compress(previous + pending[:needed], 0))
+            write_png_chunk(strip_png, b'IEND', b'')
+            with Image.open(strip_png) as strip:
+                raw = strip.tobytes()[row_bytes:]
+
+            previous = b'\x00' + raw[-row_bytes:]
+            del pending[:needed]
+            top += rows
+            yield np.frombuffer(raw, dtype=dtype).reshape((rows,) + shape).astype(dtype.newbyteorder('='))
+
+
+def iter_pages(path, strip_rows=256):
+    """
+    Yields (layout, bands) for every page of an image. bands is an iterator
+    over consecutive row bands of the page and has to be consumed before the
+    next page is requested.
+    """
+    if tifffile is not None and is_tiff(path):
+        with tifffile.TiffFile(path) as tif:
+            for page in tif.pages:
+                yield tiff_layout(page), tiff_bands(page)
+    elif is_streamable_png(path):
+        yield image_layouts(path)[0], png_bands(path, strip_rows)
+    else:
+        with Image.open(path) as img:
+            for frame in ImageSequence.Iterator(img):
+                yield pillow_layout(frame), pillow_bands(frame, strip_rows)
+
+
+def rechunk(bands, rows):
+    """Regroups row bands into new, writable bands of exactly rows rows (the last may be shorter)."""
+    pending, count = [], 0
+    for band in bands:
+        while len(band):
+            take = min(rows - count, len(band))
+            pending.append(band[:take])
+            count += take
+            band = band[take:]
+            if count == rows:
+                yield np.concatenate(pending)
+                pending, count = [], 0
+    if pending:
+        yield np.concatenate(pending)
+
+
+def write_png_chunk(f, kind, data):
+    f.write(struct.pack('>I', len(data)) + kind + data)
+    f.write(struct.pack('>I', zlib.crc32(kind + data)))
+
+
+def write_png_pages(pages, output_path, layouts, compress_level=6):
+    """
+    Writes a single-page image as PNG, compressing each strip as it arrives.
+    Rows are stored unfiltered, so files are larger than Pillow's.
+    """
+    if len(layouts) != 1:
+        raise ValueError(f"PNG holds one page, the carrier has {len(layouts)}. "
+                         f"Write multi-page carriers as TIFF.")
+    layout = layouts[0]
+    height, width = layout['shape'][:2]
+    samples = layout['shape'][2] if len(layout['shape']) == 3 else 1
+    if layout['photometric'] not in ('minisblack', 'rgb') or samples not in PNG_COLOR_TYPES:
+        raise ValueError(f"PNG cannot store {samples}-sample '{layout['photometric']}' images. "
+                         f"Write them as TIFF.")
+
+    with open(output_path, 'wb') as f:
+        f.write(PNG_SIGNATURE)
+        write_png_chunk(f, b'IHDR', struct.pack('>IIBBBBB', width, height,
+                                                layout['dtype'].itemsize * 8,
+                                                PNG_COLOR_TYPES[samples], 0, 0, 0))
+        compressor = zlib.compressobj(compress_level)
+        for _, strips in pages:
+            for strip in strips:
+                # PNG samples are big-endian; every row starts with filter type 0
+                row_bytes = strip.astype(strip.dtype.newbyteorder('>'), copy=False) \
+                    .reshape(len(strip), -1).view(np.uint8)
+                rows = np.zeros((len(strip), row_bytes.shape[1] + 1), dtype=np.uint8)
+                rows[:, 1:] = row_bytes
+                data = compressor.compress(rows.tobytes())
+                if data:
+                    write_png_chunk(f, b'IDAT', data)
+        write_png_chunk(f, b'IDAT', compressor.flush())
+        write_png_chunk(f, b'IEND', b'')
+
+
+if __name__ == "__main__":
+    input_image_path = "Sample1.png"
+    output_image_path = "Sample1_copy.png"
+
+    try:
+        layouts = image_layouts(input_image_path)
+        write_png_pages(iter_pages(input_image_path, strip_rows=64), output_image_path, layouts)
+        print(f"Copied '{input_image_path}' to '{output_image_path}' 64 rows at a time.")
+
+    except FileNotFoundError as e:
+        print(f"Error: Could not find image file. {e}")
+    except ValueError as e:
+        print(f"Error: {e}")
@@ -1,52 +1,175 @@
-from PIL import Image
 import numpy as np
-
-original_image_path = "Sample1.jpeg"
-
-
-stego_image_path = "image_output1.png"
-
-
-output_image_path = "difference_output.png"
-
-try:
-
-    original_img = Image.open(original_image_path).convert('RGB')
-    stego_img = Image.open(stego_image_path).convert('RGB')
-
-
-    if original_img.size != stego_img.size:
+from concurrent.futures import ProcessPoolExecutor
+import os
+
+from strip_io import iter_pages, rechunk, image_layouts, write_png_pages
+
+# Rows per block_ssim_sum call (a multiple of the 8-row SSIM block)
+SSIM_ROWS = 32
+
+
+def block_ssim_sum(original_strip, stego_strip, block=8):
+    """
+    Returns (sum of SSIM values, number of blocks) over the non-overlapping
+    block x block windows of a strip, computed per channel.
+    Rows and columns that do not fill a whole block are skipped.
+    """
+    c1 = (0.01 * 255) ** 2
+    c2 = (0.03 * 255) ** 2
+
+    rows = (original_strip.shape[0] // block) * block
+    cols = (original_strip.shape[1] // block) * block
+    if rows == 0 or cols == 0:
+        return 0.0, 0
+
+    channels = original_strip.shape[2]
+    shape = (rows // block, block, cols // block, block, channels)
+    x = original_strip[:rows, :cols].astype(np.float32).reshape(shape)
+    y = stego_strip[:rows, :cols].astype(np.float32).reshape(shape)
+
+    mu_x = x.mean(axis=(1, 3))
+    mu_y = y.mean(axis=(1, 3))
+    var_x = (x * x).mean(axis=(1, 3)) - mu_x ** 2
+    var_y = (y * y).mean(axis=(1, 3)) - mu_y ** 2
+    cov_xy = (x * y).mean(axis=(1, 3)) - mu_x * mu_y
+
+    ssim = ((2 * mu_x * mu_y + c1) * (2 * cov_xy + c2)) / \
+           ((mu_x ** 2 + mu_y ** 2 + c1) * (var_x + var_y + c2))
+    return float(ssim.sum()), ssim.size
+
+
+def rgb_strips(image_path, strip_rows):
+    """
+    Yields the first page of an image as RGB uint8 strips of strip_rows rows.
+    PNG and (with tifffile) TIFF files are decoded strip by strip; 16-bit
+    values are reduced to their high byte.
+    """
+    for layout, bands in iter_pages(image_path, strip_rows):
+        for strip in rechunk(bands, strip_rows):
+            if strip.dtype != np.uint8:
+                strip = (strip >> (8 * strip.dtype.itemsize - 8)).astype(np.uint8)
+            if strip.ndim == 2:
+                strip = strip[..., None]
+            samples = strip.shape[2]
+            if layout['photometric'] == 'separated':
+                # CMYK, converted like Pillow's convert('RGB')
+                ink = 255 - strip[..., 3:4].astype(np.uint16)
+                strip = (ink - strip[..., :3] * ink // 255).astype(np.uint8)
+            elif samples < 3:
+                strip = np.repeat(strip[..., :1], 3, axis=2)
+            yield np.ascontiguousarray(strip[..., :3])
+        return
+
+
+def compare_images(original_image_path, stego_image_path, output_image_path=None,
+                   strip_rows=64, amplification=255):
+    """
+    Compares a carrier and a stego image strip by strip.
+
+    Both images are decoded one strip at a time (see rgb_strips) and the
+    difference map is written as a PNG as each strip is finished, so the
+    working memory is bounded by strip_rows instead of the image size.
+    Returns a dict with MSE, PSNR, mean block SSIM and, for each of the 8
+    bit planes, how many channel values changed in that plane.
+    If output_image_path (a .png file) is given, the amplified difference map is saved there.
+    """
+    # strips must be a whole number of SSIM blocks
+    strip_rows = max(8, strip_rows - strip_rows % 8)
+
+    original_size = image_layouts(original_image_path)[0]['shape'][:2]
+    stego_size = image_layouts(stego_image_path)[0]['shape'][:2]
+    if original_size != stego_size:
         raise ValueError(f"Images must be the same size! "
-                         f"{original_img.size} vs {stego_img.size}")
-
-
-    original_data = np.array(original_img)
-    stego_data = np.array(stego_img)
-
-    original_int = original_data.astype(np.int16)
-    stego_int = stego_data.astype(np.int16)
-
-    diff_int = original_int - stego_int
-    abs_diff_int = np.absolute(diff_int)
-
-# Cast back to uint8 (0-255) to be saved as an image
-    diff_data = abs_diff_int.astype(np.uint8)
-
-
-    # Multiply by 255 to make the tiny '1' values visible as '255'
-    visual_data = diff_data * 255
-
-
-    diff_img = Image.fromarray(visual_data, 'RGB')
-
-
-    diff_img.save(output_image_path)
-    print(f"Difference image saved to {output_image_path}")
-
-
-    diff_img.show()
-
-except FileNotFoundError as e:
-    print(f"Error: Could not find image file. {e}")
-except ValueError as e:
-    print(f"Error: {e}")
+                         f"{original_size[::-1]} vs {stego_size[::-1]}")
+    if output_image_path and not output_image_path.lower().endswith('.png'):
+        raise ValueError("Difference maps are written as PNG; use a .png output path.")
+    height, width = original_size
+
+    totals = {'squared_error': 0, 'ssim_total': 0.0, 'ssim_blocks': 0,
+              'bit_plane_changes': np.zeros(8, dtype=np.int64)}
+
+    def diff_strips():
+        for original_strip, stego_strip in zip(rgb_strips(original_image_path, strip_rows),
+                                               rgb_strips(stego_image_path, strip_rows)):
+            diff = np.abs(original_strip.astype(np.int16) - stego_strip)
+            totals['squared_error'] += int(np.square(diff, dtype=np.int32).sum(dtype=np.int64))
+
+            # SSIM needs several float copies, so it runs on a few block rows at a time
+            for top in range(0, len(original_strip), SSIM_ROWS):
+                strip_sum, strip_blocks = block_ssim_sum(original_strip[top:top + SSIM_ROWS],
+                                                         stego_strip[top:top + SSIM_ROWS])
+                totals['ssim_total'] += strip_sum
+                totals['ssim_blocks'] += strip_blocks
+
+            changed = np.bitwise_xor(original_strip, stego_strip)
+            for plane in range(8):
+                totals['bit_plane_changes'][plane] += np.count_nonzero(changed & (1 << plane))
+
+            # Clip instead of letting uint8 wrap around for differences > 1
+            yield np.where(diff > 255 // amplification, 255,
+                           diff * amplification).astype(np.uint8)
+
+    if output_image_path:
+        layout = {'shape': (height, width, 3), 'dtype': np.dtype(np.uint8), 'photometric': 'rgb'}
+        write_png_pages([(layout, diff_strips())], output_image_path, [layout])
+        print(f"Difference image saved to {output_image_path}")
+    else:
+        for _ in diff_strips():
+            pass
+
+    mse = totals['squared_error'] / (width * height * 3)
+    psnr = float('inf') if mse == 0 else 10 * np.log10(255 ** 2 / mse)
+    ssim = totals['ssim_total'] / totals['ssim_blocks'] if totals['ssim_blocks'] else 1.0
+
+    return {
+        'original': original_image_path,
+        'stego': stego_image_path,
+        'mse': mse,
+        'psnr': psnr,
+        'ssim': ssim,
+        'bit_plane_changes': totals['bit_plane_changes'].tolist(),
+    }
+
+
+def _compare_pair(args):
+    return compare_images(*args)
+
+
+def compare_batch(pairs, output_dir=None, workers=None, strip_rows=64):
+    """
+    Compares a list of (carrier_path, stego_path) pairs in a process pool.
+    Difference maps are written to output_dir (if given) as <stego name>_diff.png.
+    """
+    jobs = []
+    for original_path, stego_path in pairs:
+        output_path = None
+        if output_dir:
+            stem = os.path.splitext(os.path.basename(stego_path))[0]
+            output_path = os.path.join(output_dir, f"{stem}_diff.png")
+        jobs.append((original_path, stego_path, output_path, strip_rows))
+
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_compare_pair, jobs))
+
+
+def print_report(result):
+    print(f"{result['stego']}: MSE={result['mse']:.4f}  PSNR={result['psnr']:.2f} dB  "
+          f"SSIM={result['ssim']:.5f}")
+    print("  Changed values per bit plane (LSB first):", result['bit_plane_changes'])
+
+
+if __name__ == "__main__":
+    original_image_path = "Sample1.jpeg"
+    stego_image_path = "image_output1.png"
+    output_image_path = "difference_output.png"
+
+    try:
+        print_report(compare_images(original_image_path, stego_image_path, output_image_path))
+
+    except FileNotFoundError as e:
+        print(f"Error: Could not find image file. {e}")
+    except ValueError as e:
+        print(f"Error: {e}")
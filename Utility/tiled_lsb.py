@@ -0,0 +1,168 @@
+from PIL import Image
+import numpy as np
+import os
+
+from strip_io import (tifffile, is_tiff, image_layouts, iter_pages, rechunk,
+                      write_png_pages)
+from stego_header import (HEADER_SIZE, HEADER_BITS, build_header, parse_header,
+                          verify_payload, bytes_to_bits, embed_lsb)
+from embedders import as_payload
+
+# Methods written by encode_image_tiled (see tiled_method)
+TILED_METHODS = ('image_lsb', 'image_lsb_tiled')
+
+
+def bits_slice(data, start, count):
+    """Returns bits start .. start + count of a bytes object (MSB first) without unpacking the rest."""
+    first_byte = start // 8
+    bits = np.unpackbits(np.frombuffer(data, dtype=np.uint8,
+                                       count=(start + count + 7) // 8 - first_byte,
+                                       offset=first_byte))
+    offset = start - first_byte * 8
+    return bits[offset:offset + count]
+
+
+def tiled_capacity(carrier_path):
+    """Largest payload in bytes: one bit per value over all pages, minus the header."""
+    values = sum(int(np.prod(layout['shape'])) for layout in image_layouts(carrier_path))
+    return max(0, (values - HEADER_BITS) // 8)
+
+
+def write_tiff_pages(pages, output_path, layouts, strip_rows):
+    """Writes every page uncompressed with strip_rows rows per strip, one strip at a time."""
+    if tifffile is None:
+        raise ValueError("Writing TIFF files strip by strip needs the tifffile package.")
+
+    total_bytes = sum(int(np.prod(layout['shape'])) * layout['dtype'].itemsize
+                      for layout in layouts)
+    with tifffile.TiffWriter(output_path, bigtiff=total_bytes > 2 ** 32 - 2 ** 25) as tif:
+        for layout, strips in pages:
+            tif.write((strip.tobytes() for strip in strips), shape=layout['shape'],
+                      dtype=layout['dtype'], photometric=layout['photometric'],
+                      extrasamples=layout['extrasamples'] or None,
+                      subfiletype=layout['subfiletype'], rowsperstrip=strip_rows,
+                      compression=None, metadata=None)
+
+
+def tiled_method(layouts):
+    """
+    Method id for a carrier's pages. A single 8-bit RGB page holds its bits
+    exactly where LSBEmbedder (and Pillow's convert('RGB')) looks for them,
+    so it is stamped 'image_lsb'; any other layout is 'image_lsb_tiled'.
+    """
+    if len(layouts) == 1:
+        layout = layouts[0]
+        if (layout['dtype'] == np.uint8 and len(layout['shape']) == 3 and layout['shape'][2] == 3
+                and layout['photometric'] == 'rgb'):
+            return 'image_lsb'
+    return 'image_lsb_tiled'
+
+
+def encode_image_tiled(carrier_path, payload, output_path, strip_rows=256):
+    """
+    Hides a payload in the LSBs of an image, strip by strip.
+
+    Values are used in page order and row-major order within a page, in the
+    page's own mode (L, LA, RGB, RGBA, CMYK, 16-bit), so pages of multi-page
+    TIFFs add capacity. Only strip_rows rows of the carrier are held at a
+    time; with tifffile, TIFF carriers are never decoded whole. Output is
+    TIFF (any carrier) or PNG (single page), chosen by extension. For a
+    single-page 8-bit RGB carrier the result is identical to LSBEmbedder's;
+    every other layout gets its own method id, 'image_lsb_tiled', since
+    readers that convert to RGB would not find its bits.
+    """
+    payload = as_payload(payload)
+    layouts = image_layouts(carrier_path)
+    capacity = tiled_capacity(carrier_path)
+    if len(payload) > capacity:
+        raise ValueError(f"Payload is too large for this carrier! \n"
+                         f"Needed: {len(payload)} bytes \n"
+                         f"Have:   {capacity} bytes")
+
+    extension = os.path.splitext(output_path)[1].lower()
+    if not is_tiff(output_path) and extension != '.png':
+        raise ValueError(f"Strip-by-strip output is written as .tif or .png, not '{extension}'.")
+
+    framed = build_header(tiled_method(layouts), payload) + payload
+    total_bits = len(framed) * 8
+    position = 0
+
+    def stego_strips(bands):
+        nonlocal position
+        for strip in rechunk(bands, strip_rows):
+            count = min(strip.size, total_bits - position)
+            if count > 0:
+                embed_lsb(strip.reshape(-1), bits_slice(framed, position, count))
+                position += count
+            yield strip
+
+    print(f"Hiding {len(payload)} bytes in {len(layouts)} page(s) with {capacity} available bytes.")
+    pages = ((layout, stego_strips(bands)) for layout, bands in iter_pages(carrier_path, strip_rows))
+    if is_tiff(output_path):
+        write_tiff_pages(pages, output_path, layouts, strip_rows)
+    else:
+        write_png_pages(pages, output_path, layouts)
+
+
+def decode_image_tiled(stego_path, strip_rows=256):
+    """
+    Extracts a payload written by encode_image_tiled. Reading stops as soon
+    as the header and payload are complete.
+    """
+    chunks, pending = [], np.zeros(0, dtype=np.uint8)
+    collected, needed, header = 0, HEADER_SIZE, None
+
+    for _, bands in iter_pages(stego_path, strip_rows):
+        for band in bands:
+            bits = np.concatenate([pending, (band.reshape(-1) & 1).astype(np.uint8)])
+            whole = len(bits) // 8 * 8
+            chunks.append(np.packbits(bits[:whole]).tobytes())
+            pending = bits[whole:]
+            collected += whole // 8
+
+            if header is None and collected >= HEADER_SIZE:
+                data = b''.join(chunks)
+                header = parse_header(bytes_to_bits(data[:HEADER_SIZE]))
+                if header['method'] not in TILED_METHODS:
+                    raise ValueError(f"Payload was embedded with '{header['method']}', "
+                                     f"not by encode_image_tiled.")
+                needed = HEADER_SIZE + header['length']
+                chunks = [data]
+            if header is not None and collected >= needed:
+                payload = b''.join(chunks)[HEADER_SIZE:needed]
+                verify_payload(header, payload)
+                return payload
+
+    if header is None:
+        raise ValueError("File is too small to contain a stego header.")
+    raise ValueError(f"Carrier is corrupted or incomplete. Expected {needed * 8} bits, "
+                     f"found {collected * 8}.")
+
+
+if __name__ == "__main__":
+    carrier_path = "multipage_carrier.tif"
+    stego_path = "stego_multipage.tif"
+    payload_text = b"Strips and pages: " + bytes(range(256)) * 500
+
+    # Three pages of different modes and bit depths
+    rng = np.random.default_rng(0)
+    pages = [Image.fromarray(rng.integers(0, 256, (600, 400, 4), dtype=np.uint8), 'RGBA'),
+             Image.fromarray(rng.integers(0, 256, (300, 500), dtype=np.uint8), 'L'),
+             Image.fromarray(rng.integers(0, 65536, (300, 300), dtype=np.uint16))]
+    pages[0].save(carrier_path, save_all=True, append_images=pages[1:])
+
+    try:
+        encode_image_tiled(carrier_path, payload_text, stego_path, strip_rows=64)
+        print("Encoding complete. Stego image saved as", stego_path)
+        print("Page modes:", [layout['dtype'].name + str(layout['shape'])
+                              for layout in image_layouts(stego_path)])
+
+        recovered = decode_image_tiled(stego_path)
+        print(f"Payload of {len(recovered)} bytes passed its checksum. "
+              f"Matches: {recovered == payload_text}")
+
+    except FileNotFoundError as e:
+        print(f"Error: {e}")
+    except ValueError as e:
+        print("\n--- An error occurred ---")
+        print(e)